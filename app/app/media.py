@@ -0,0 +1,156 @@
+"""
+    Serving of uploaded media files with long-lived caching and range requests.
+
+    Media files are named by the hash of their content, so their URLs never change
+    meaning and responses can be cached forever. Files are sent with FileResponse,
+    which WSGI servers pass to sendfile(), or with an X-Accel-Redirect header when
+    MEDIA_ACCEL_REDIRECT names an internal location of the front proxy.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """File-like view of length bytes of an open file from start.
+
+    It has no fileno(), servers passing that to sendfile() would send the whole file.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return (start, end) of a single byte range, None to ignore the header.
+
+    Raises ValueError for ranges starting past the end of the file.
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if match is None:
+        # Malformed and multiple ranges are answered with the whole file.
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        if int(last) == 0:
+            raise ValueError("Range not satisfiable.")
+        # A suffix range, i.e. the last bytes of the file.
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        if last and int(last) < start:
+            return None
+        raise ValueError("Range not satisfiable.")
+
+    return start, end
+
+
+def _range_applies(request, etag, last_modified):
+    """Return whether a Range header may be used, according to If-Range."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+
+    return parse_http_date_safe(if_range) == last_modified
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file of MEDIA_ROOT."""
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found.")
+    try:
+        stat = os.stat(fullpath)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File not found.")
+    if not os.path.isfile(fullpath):
+        raise Http404("File not found.")
+
+    # The name is derived from the content, so it makes a strong validator.
+    etag = f'"{posixpath.splitext(posixpath.basename(path))[0]}"'
+    last_modified = int(stat.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": f"public, max-age={settings.MEDIA_MAX_AGE}, immutable",
+    }
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type = mimetypes.guess_type(fullpath)[0] or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # The proxy sends the file and handles ranges itself.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT + path
+    else:
+        response = _file_response(request, fullpath, stat.st_size, etag, last_modified)
+        response["Content-Type"] = content_type
+
+    for name, value in headers.items():
+        response[name] = value
+
+    return response
+
+
+def _file_response(request, fullpath, size, etag, last_modified):
+    byte_range = None
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header and _range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(fullpath, "rb")
+    if byte_range is None:
+        response = FileResponse(file)
+    elif byte_range == (0, size - 1):
+        # The file itself can still go through sendfile().
+        response = FileResponse(file, status=206)
+        response["Content-Range"] = f"bytes 0-{size - 1}/{size}"
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1), status=206)
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+
+    return response
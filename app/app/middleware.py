@@ -0,0 +1,92 @@
+"""
+    Response compression with brotli or gzip.
+"""
+import gzip
+
+from django.conf import settings
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def _quality(value):
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def accepted_encodings(header):
+    """Return {coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                q = _quality(value)
+        accepted[coding.strip().lower()] = q
+
+    return accepted
+
+
+def choose_encoding(header):
+    """Return the best supported coding the client accepts, brotli winning ties, or None."""
+    accepted = accepted_encodings(header)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [
+        (accepted.get(coding, accepted.get("*", 0.0)), -index, coding)
+        for index, coding in enumerate(supported)
+    ]
+    q, _, coding = max(candidates)
+
+    return coding if q > 0 else None
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses above RESPONSE_COMPRESSION["MIN_SIZE"] bytes.
+
+    Streaming responses are left to Django's gzip handling, files are sent as they are so
+    that servers can use sendfile() and answer range requests.
+    """
+
+    def process_response(self, request, response):
+        if isinstance(response, FileResponse):
+            return response
+        if response.streaming:
+            return super().process_response(request, response)
+        if response.has_header("Content-Encoding"):
+            return response
+
+        options = settings.RESPONSE_COMPRESSION
+        if len(response.content) < options["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding == "br":
+            content = brotli.compress(response.content, quality=options["BROTLI_QUALITY"])
+        elif coding == "gzip":
+            content = gzip.compress(response.content, compresslevel=options["GZIP_LEVEL"], mtime=0)
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = coding
+        # The compressed body is a different representation, see GZipMiddleware.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+
+        return response
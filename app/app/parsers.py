@@ -0,0 +1,27 @@
+"""
+    JSON parser backed by orjson, when it is installed.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """Parse UTF-8 JSON with orjson, falling back to the standard parser."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8").lower().replace("_", "-")
+        # orjson always rejects NaN and Infinity, only the stdlib parser can accept them.
+        if orjson is None or encoding != "utf-8" or not api_settings.STRICT_JSON:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
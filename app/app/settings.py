@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "app.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -91,6 +92,16 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -129,6 +140,15 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 
+# Uploaded files, i.e. recipe images and their thumbnails.
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", "/vol/web/media")
+# Media file names are content hashes, so responses are cached for a year.
+MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", 365 * 24 * 60 * 60))
+# Internal location of the front proxy serving MEDIA_ROOT, e.g. "/protected-media/". When
+# set, media responses only carry an X-Accel-Redirect header and the proxy sends the file.
+MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT", "")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -138,4 +158,102 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "app.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "app.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Responses smaller than MIN_SIZE bytes are sent uncompressed.
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": int(os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", 1024)),
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
 }
+
+# In-process cache of authenticated tokens, times in seconds. Entries are kept LOCAL_TTL
+# seconds in each process, so a revoked token or deactivated user is refused by every
+# process after that long at most. Set CACHE_ALIAS to a name from CACHES to share
+# entries between processes for TTL seconds. Code deactivating users without saving
+# them, with QuerySet.update() for instance, must then call forget_user_tokens() from
+# user.authentication.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": int(os.environ.get("TOKEN_AUTH_CACHE_MAX_SIZE", 10000)),
+    "TTL": int(os.environ.get("TOKEN_AUTH_CACHE_TTL", 300)),
+    "LOCAL_TTL": int(os.environ.get("TOKEN_AUTH_CACHE_LOCAL_TTL", 5)),
+    "CACHE_ALIAS": os.environ.get("TOKEN_AUTH_CACHE_ALIAS") or None,
+}
+
+# Database-backed task queue run by "manage.py run_worker". Failed tasks are retried
+# after RETRY_DELAY * 2 ** (attempt - 1) seconds, running tasks whose worker did not
+# finish them within TIMEOUT seconds are queued again. Times are in seconds.
+TASK_QUEUE = {
+    "CONCURRENCY": int(os.environ.get("TASK_QUEUE_CONCURRENCY", 4)),
+    "POLL_INTERVAL": float(os.environ.get("TASK_QUEUE_POLL_INTERVAL", 1)),
+    "MAX_ATTEMPTS": int(os.environ.get("TASK_QUEUE_MAX_ATTEMPTS", 5)),
+    "RETRY_DELAY": int(os.environ.get("TASK_QUEUE_RETRY_DELAY", 10)),
+    "TIMEOUT": int(os.environ.get("TASK_QUEUE_TIMEOUT", 600)),
+    "STATS_INTERVAL": int(os.environ.get("TASK_QUEUE_STATS_INTERVAL", 60)),
+}
+
+SPECTACULAR_SETTINGS = {
+    "VERSION": "1.0.0",
+}
+
+# Directory holding the schema files written by "manage.py build_schema", and how long
+# clients may cache them for.
+API_SCHEMA_DIR = os.environ.get("API_SCHEMA_DIR", str(BASE_DIR / "schema"))
+API_SCHEMA_MAX_AGE = int(os.environ.get("API_SCHEMA_MAX_AGE", 3600))
+
+# Default and maximum number of items returned per page by the recipe APIs.
+RECIPE_PAGE_SIZE = int(os.environ.get("RECIPE_PAGE_SIZE", 50))
+RECIPE_MAX_PAGE_SIZE = int(os.environ.get("RECIPE_MAX_PAGE_SIZE", 200))
+
+# Querysets with more rows than this are counted from planner estimates in the admin.
+ESTIMATED_COUNT_THRESHOLD = int(os.environ.get("ESTIMATED_COUNT_THRESHOLD", 10000))
+
+# Text search configuration used to parse recipe search queries, it has to match the
+# configuration of the core_recipe search vector trigger.
+RECIPE_SEARCH_CONFIG = "english"
+
+# Cache used for the rendered tag and ingredient lists, timeouts in seconds. Lists are
+# invalidated in every process only when ALIAS names a cache shared between them
+# (Memcached, Redis or the database). With a process-local cache like the default
+# LocMemCache, entries expire after LOCAL_TIMEOUT so that other processes serve
+# outdated lists for that long at most. Each process logs its hit rate every
+# STATS_INTERVAL seconds.
+RECIPE_LIST_CACHE = {
+    "ALIAS": os.environ.get("RECIPE_LIST_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("RECIPE_LIST_CACHE_TIMEOUT", 300)),
+    "LOCAL_TIMEOUT": int(os.environ.get("RECIPE_LIST_CACHE_LOCAL_TIMEOUT", 5)),
+    "STATS_INTERVAL": int(os.environ.get("RECIPE_LIST_CACHE_STATS_INTERVAL", 300)),
+}
+
+# Maximum number of objects accepted by a single bulk create, delete or rename request.
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get("RECIPE_BULK_MAX_ITEMS", 500))
+
+# Number of recipes read from the database at a time by the NDJSON export.
+RECIPE_EXPORT_CHUNK_SIZE = int(os.environ.get("RECIPE_EXPORT_CHUNK_SIZE", 1000))
+
+# Similar-recipe lookups: default and maximum number of results, seconds between checks
+# of an in-memory index against the database, and number of users' indexes kept.
+RECIPE_SIMILARITY = {
+    "LIMIT": 10,
+    "MAX_LIMIT": 100,
+    "CHECK_INTERVAL": int(os.environ.get("RECIPE_SIMILARITY_CHECK_INTERVAL", 5)),
+    "MAX_USERS": int(os.environ.get("RECIPE_SIMILARITY_MAX_USERS", 100)),
+}
+
+# Maximum size of an uploaded recipe image in bytes, uploads are streamed to disk and
+# abandoned as soon as they grow past it.
+RECIPE_IMAGE_MAX_SIZE = int(os.environ.get("RECIPE_IMAGE_MAX_SIZE", 10 * 1024 * 1024))
+
+# Longest side of recipe thumbnails in pixels, and the number of processes rendering
+# them for the task queue workers. With 0 they are rendered in the worker threads.
+RECIPE_THUMBNAIL_SIZE = int(os.environ.get("RECIPE_THUMBNAIL_SIZE", 256))
+RECIPE_THUMBNAIL_WORKERS = int(os.environ.get("RECIPE_THUMBNAIL_WORKERS", os.cpu_count() or 1))
@@ -1,11 +1,16 @@
 """
     Django admin customizations for core app.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.postgres.search import SearchQuery
+from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 
 from . import models
+from .deletion import delete_user
+from .paginator import EstimatedCountPaginator
 
 
 class UserAdmin(BaseUserAdmin):
@@ -49,8 +54,87 @@ class UserAdmin(BaseUserAdmin):
         ),
     )
 
+    def get_deleted_objects(self, objs, request):
+        """Summarize the owned rows by count instead of collecting every one of them."""
+        deleted_objects = [f"{capfirst(models.User._meta.verbose_name)}: {obj}" for obj in objs]
+        model_count = {models.User._meta.verbose_name_plural: len(objs)}
+        perms_needed = set()
+        for model in (models.Recipe, models.Tag, models.Ingredient):
+            opts = model._meta
+            model_count[opts.verbose_name_plural] = model.objects.filter(user__in=objs).count()
+            if not self.admin_site._registry[model].has_delete_permission(request):
+                perms_needed.add(opts.verbose_name)
+
+        return deleted_objects, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            delete_user(user)
+
+
+class UserOwnedAdmin(admin.ModelAdmin):
+    """Base admin for objects owned by a user, built for users with very many rows."""
+
+    paginator = EstimatedCountPaginator
+    # Skip the unfiltered COUNT(*) shown next to search results.
+    show_full_result_count = False
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    search_fields = ("=user__email",)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search by the owner's exact email, which is backed by a unique index."""
+        if not search_term:
+            return queryset, False
+
+        return queryset.filter(user__email=search_term.strip()), False
+
+
+class RecipeAdmin(UserOwnedAdmin):
+    """Define the admin pages for recipes."""
+
+    list_display = ("title", "user", "time_minutes", "price", "updated_at")
+    raw_id_fields = ("user", "tags", "ingredients")
+    search_fields = ("title", "description")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search titles and descriptions through the full-text GIN index."""
+        if not search_term:
+            return queryset, False
+
+        query = SearchQuery(
+            search_term, config=settings.RECIPE_SEARCH_CONFIG, search_type="websearch"
+        )
+        return queryset.filter(search_vector=query), False
+
+
+class TagAdmin(UserOwnedAdmin):
+    """Define the admin pages for tags."""
+
+    list_display = ("name", "user", "updated_at")
+
+
+class IngredientAdmin(UserOwnedAdmin):
+    """Define the admin pages for ingredients."""
+
+    list_display = ("name", "user", "updated_at")
+
+
+class TaskAdmin(admin.ModelAdmin):
+    """Define the admin pages for queued and failed tasks."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ("name", "status", "attempts", "run_at", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("attempts", "locked_at", "last_error", "created_at")
+
 
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Recipe)
-admin.site.register(models.Tag)
-admin.site.register(models.Ingredient)
+admin.site.register(models.Recipe, RecipeAdmin)
+admin.site.register(models.Tag, TagAdmin)
+admin.site.register(models.Ingredient, IngredientAdmin)
+admin.site.register(models.Task, TaskAdmin)
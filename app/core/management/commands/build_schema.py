@@ -0,0 +1,28 @@
+"""
+    Django command to build the OpenAPI schema files served by the API.
+"""
+import os
+
+from core.schema import schema_path
+from django.core.management.base import BaseCommand
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once and write it to API_SCHEMA_DIR."
+
+    def handle(self, *args, **options):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        for schema_format, renderer in RENDERERS.items():
+            path = schema_path(schema_format)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            content = renderer().render(schema, renderer_context={})
+            # Write then rename so a running server never reads a partial file.
+            with open(f"{path}.tmp", "wb") as file:
+                file.write(content)
+            os.replace(f"{path}.tmp", path)
+            self.stdout.write(self.style.SUCCESS(f"Schema written to {path}"))
@@ -0,0 +1,48 @@
+"""
+    Django command to import recipes for a user from an NDJSON or CSV file.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from recipe import importer
+
+
+class Command(BaseCommand):
+    help = "Import recipes from an NDJSON or CSV file using PostgreSQL COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--user", required=True, help="Email of the recipes' owner.")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=importer.FORMATS,
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        path = options["path"]
+        file_format = options["file_format"] or ("csv" if path.endswith(".csv") else "ndjson")
+
+        started = time.monotonic()
+        with open(path, encoding="utf-8", newline="") as lines:
+            result = importer.import_recipes(
+                user, importer.READERS[file_format](lines), batch_size=options["batch_size"]
+            )
+        elapsed = time.monotonic() - started
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} recipes in {elapsed:.2f}s, "
+                f"{len(result.errors)} rows rejected."
+            )
+        )
@@ -0,0 +1,67 @@
+"""
+    Django command to run the database-backed task queue.
+"""
+import signal
+import threading
+import time
+
+from core import tasks
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Run queued tasks with a number of worker threads until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TASK_QUEUE["CONCURRENCY"],
+            help="Number of tasks run at the same time.",
+        )
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once no task is due instead of polling."
+        )
+
+    def handle(self, *args, **options):
+        tasks.discover_tasks()
+        stop = threading.Event()
+        stats = tasks.WorkerStats()
+        handlers = {
+            signum: signal.signal(signum, lambda *args: stop.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.run_workers(stop, stats, options)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.write_stats(stats)
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
+
+    def run_workers(self, stop, stats, options):
+        threads = [
+            threading.Thread(target=tasks.work, args=(stop, stats, options["burst"]))
+            for _ in range(options["concurrency"])
+        ]
+        self.stdout.write(f"Running {len(threads)} workers for: {', '.join(sorted(tasks.TASKS))}")
+        for thread in threads:
+            thread.start()
+
+        interval = settings.TASK_QUEUE["STATS_INTERVAL"]
+        next_report = time.monotonic() + interval
+        while any(thread.is_alive() for thread in threads):
+            # Joined with a timeout so that the signal handlers can run.
+            for thread in threads:
+                thread.join(timeout=1)
+            if time.monotonic() >= next_report:
+                self.write_stats(stats)
+                next_report += interval
+
+    def write_stats(self, stats):
+        self.stdout.write(
+            "{succeeded} succeeded, {retried} retried, {failed} failed, "
+            "{tasks_per_second:.1f} tasks/s".format(**stats.as_dict())
+        )
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.19 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+MERGE_DUPLICATE_TAGS = """
+    WITH duplicates AS (
+        SELECT id, MIN(id) OVER (PARTITION BY user_id, name) AS keep_id
+        FROM core_tag
+    )
+    INSERT INTO core_recipe_tags (recipe_id, tag_id)
+    SELECT rt.recipe_id, d.keep_id
+    FROM core_recipe_tags rt
+    JOIN duplicates d ON d.id = rt.tag_id
+    WHERE d.id <> d.keep_id
+    ON CONFLICT (recipe_id, tag_id) DO NOTHING;
+
+    DELETE FROM core_recipe_tags
+    WHERE tag_id IN (
+        SELECT id FROM (
+            SELECT id, MIN(id) OVER (PARTITION BY user_id, name) AS keep_id FROM core_tag
+        ) d
+        WHERE d.id <> d.keep_id
+    );
+
+    DELETE FROM core_tag
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, MIN(id) OVER (PARTITION BY user_id, name) AS keep_id FROM core_tag
+        ) d
+        WHERE d.id <> d.keep_id
+    );
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_auto_20230618_0943'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_TAGS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_tag_name_per_user'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.19 on 2026-10-18 12:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BATCH_SIZE = 5000
+
+BACKFILL_BATCH = """
+    UPDATE core_recipe
+    SET search_vector =
+        setweight(to_tsvector('pg_catalog.english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('pg_catalog.english', coalesce(description, '')), 'B')
+    WHERE id >= %s AND id < %s AND search_vector IS NULL
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Fill search vectors of existing recipes in short batches, each committed on its own."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM core_recipe")
+        first, last = cursor.fetchone()
+        if first is None:
+            return
+        for start in range(first, last + 1, BATCH_SIZE):
+            cursor.execute(BACKFILL_BATCH, [start, start + BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    # Batches commit one by one and the index is built without locking writes.
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.19 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='recipes/'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='thumbnail',
+            field=models.ImageField(
+                blank=True, editable=False, null=True, upload_to='recipes/thumbnails/'
+            ),
+        ),
+    ]
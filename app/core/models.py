@@ -1,6 +1,9 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -43,16 +46,50 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField("Tag", related_name="recipes")
     ingredients = models.ManyToManyField("Ingredient", related_name="recipes")
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger from title and description.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set by the image upload action, files are named by the hash of their content.
+    image = models.ImageField(null=True, blank=True, editable=False, upload_to="recipes/")
+    thumbnail = models.ImageField(
+        null=True, blank=True, editable=False, upload_to="recipes/thumbnails/"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "-id"), name="recipe_user_id_desc_idx"),
+            models.Index(fields=("user", "price"), name="recipe_user_price_idx"),
+            models.Index(fields=("user", "time_minutes"), name="recipe_user_time_idx"),
+            models.Index(fields=("user", "updated_at"), name="recipe_user_updated_at_idx"),
+            GinIndex(fields=("search_vector",), name="recipe_search_vector_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def image_status(self):
+        """Return None without an image, "pending" until its thumbnail exists, else "ready"."""
+        if not self.image:
+            return None
+
+        return "ready" if self.thumbnail else "pending"
+
 
 class Tag(models.Model):
     """Model for filtering recipes."""
 
     name = models.CharField(max_length=100)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tags")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("user", "name"), name="unique_tag_name_per_user"),
+        ]
+        indexes = [
+            models.Index(fields=("user", "updated_at"), name="tag_user_updated_at_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -63,6 +100,45 @@ class Ingredient(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ingredients")
     name = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "name"), name="ingredient_user_name_idx"),
+            models.Index(fields=("user", "updated_at"), name="ingredient_user_updated_at_idx"),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class Task(models.Model):
+    """Deferred call of a registered task, run by "manage.py run_worker"."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Only due tasks are looked up, finished tasks are deleted.
+            models.Index(
+                fields=("run_at",),
+                condition=models.Q(status="pending"),
+                name="task_pending_run_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,49 @@
+"""
+    Paginator using estimated counts for large querysets.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset, threshold=None):
+    """Return the exact number of rows up to the threshold, the planner's estimate above it.
+
+    The exact count stops after threshold + 1 rows, so it stays cheap however large the
+    table is. The estimate comes from EXPLAIN and never goes below that partial count.
+    """
+    if threshold is None:
+        threshold = settings.ESTIMATED_COUNT_THRESHOLD
+
+    counted = queryset[: threshold + 1].count()
+    if counted <= threshold:
+        return counted
+
+    return max(planner_rows(queryset), counted)
+
+
+def query_plan(queryset):
+    """Return the root node of the queryset's EXPLAIN (FORMAT JSON) plan."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        # QuerySet.explain() returns str() of the plan, so run EXPLAIN directly.
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return cursor.fetchone()[0][0]["Plan"]
+
+
+def planner_rows(queryset):
+    """Return the number of rows the planner expects the queryset to return."""
+    return int(query_plan(queryset)["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count is estimated for large querysets, see estimated_count()."""
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+
+        return super().count
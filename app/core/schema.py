@@ -0,0 +1,64 @@
+"""
+    Serving the OpenAPI schema from a file built ahead of time.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.exceptions import NotFound
+
+SCHEMA_FORMATS = ("yaml", "json")
+
+_loaded = {}
+
+
+def schema_path(schema_format):
+    """Return the path of the built schema file for the API version and format."""
+    return os.path.join(
+        settings.API_SCHEMA_DIR, f"openapi-{spectacular_settings.VERSION}.{schema_format}"
+    )
+
+
+def load_schema(path):
+    """Return the file's content and ETag, reading it again only when it changes."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as file:
+            content = file.read()
+        cached = (mtime, content, quote_etag(hashlib.sha256(content).hexdigest()))
+        _loaded[path] = cached
+
+    return cached[1], cached[2]
+
+
+class PrecomputedSchemaView(SpectacularAPIView):
+    """Serve the schema written by the build_schema command.
+
+    Without a built file the schema is generated on each request in DEBUG only.
+    """
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        schema_format = "json" if "json" in request.accepted_renderer.format else "yaml"
+        try:
+            content, etag = load_schema(schema_path(schema_format))
+        except FileNotFoundError:
+            if settings.DEBUG:
+                return super().get(request, *args, **kwargs)
+            raise NotFound("The API schema has not been built.")
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if etag in {tag.replace("W/", "", 1) for tag in parse_etags(if_none_match)}:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(content, content_type=request.accepted_media_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={settings.API_SCHEMA_MAX_AGE}"
+
+        return response
@@ -0,0 +1,189 @@
+"""
+    Task queue stored in PostgreSQL.
+
+    Tasks are rows of core_task, claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED
+    so that any number of workers can poll the table without blocking each other.
+    Enqueueing is transactional: a task only becomes visible to workers when the
+    transaction that created it commits. Finished tasks are deleted, failed ones are
+    retried with exponential backoff and kept once they run out of attempts.
+"""
+import logging
+import random
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from core.models import Task
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(func):
+    """Register a function as a task, enqueue calls of it with func.delay(**kwargs)."""
+    name = f"{func.__module__}.{func.__qualname__}"
+    TASKS[name] = func
+    func.task_name = name
+    func.delay = lambda **kwargs: enqueue(name, kwargs)
+
+    return func
+
+
+def discover_tasks():
+    """Import the tasks module of every installed app."""
+    autodiscover_modules("tasks")
+
+
+def enqueue(name, kwargs=None, *, run_at=None, max_attempts=None):
+    """Add a call of a registered task to the queue, kwargs must be JSON serializable."""
+    if name not in TASKS:
+        raise KeyError(f"Unknown task {name}.")
+
+    return Task.objects.create(
+        name=name,
+        kwargs=kwargs or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.TASK_QUEUE["MAX_ATTEMPTS"],
+    )
+
+
+def retry_delay(attempts):
+    """Return the delay before retrying a task that failed attempts times, with jitter."""
+    delay = settings.TASK_QUEUE["RETRY_DELAY"] * 2 ** (attempts - 1)
+    return timedelta(seconds=delay * random.uniform(1, 1.5))
+
+
+class WorkerStats:
+    """Thread-safe counters of processed tasks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            processed = self.succeeded + self.retried + self.failed
+            return {
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+                "tasks_per_second": processed / elapsed if elapsed else 0.0,
+            }
+
+
+def claim_task():
+    """Mark the next due task as running and return it, or None if none is due."""
+    with transaction.atomic():
+        task = (
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.PENDING, run_at__lte=timezone.now())
+            .order_by("run_at")
+            .first()
+        )
+        if task is None:
+            return None
+
+        task.status = Task.RUNNING
+        task.attempts += 1
+        task.locked_at = timezone.now()
+        task.save(update_fields=["status", "attempts", "locked_at"])
+
+    return task
+
+
+def requeue_stale_tasks():
+    """Return tasks of workers that died while running them to the queue.
+
+    Tasks that used up their attempts are marked failed instead, so that a task killing
+    its worker is not picked up again forever.
+    """
+    timeout = timedelta(seconds=settings.TASK_QUEUE["TIMEOUT"])
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=timezone.now() - timeout)
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Task.FAILED, locked_at=None, last_error="The worker running the task stopped."
+    )
+
+    return stale.update(status=Task.PENDING, locked_at=None)
+
+
+def run_task(task, stats=None):
+    """Run a claimed task, then delete it, schedule a retry or mark it failed."""
+    try:
+        with transaction.atomic():
+            TASKS[task.name](**task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            outcome = "retried"
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + retry_delay(task.attempts)
+        else:
+            outcome = "failed"
+            task.status = Task.FAILED
+        logger.warning(
+            "Task %s %s %s after attempt %d", task.pk, task.name, outcome, task.attempts
+        )
+        task.last_error = error
+        task.locked_at = None
+        task.save(update_fields=["status", "run_at", "last_error", "locked_at"])
+    else:
+        outcome = "succeeded"
+        task.delete()
+
+    if stats is not None:
+        stats.record(outcome)
+
+    return outcome
+
+
+def run_tasks(stats=None):
+    """Run due tasks in the current thread until none is left, return how many ran."""
+    count = 0
+    while True:
+        task = claim_task()
+        if task is None:
+            return count
+        run_task(task, stats)
+        count += 1
+
+
+def work(stop, stats, burst=False):
+    """Run tasks until stop is set, polling every TASK_QUEUE["POLL_INTERVAL"] seconds.
+
+    With burst, return as soon as no task is due instead.
+    """
+    poll_interval = settings.TASK_QUEUE["POLL_INTERVAL"]
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                task = claim_task()
+                if task is None:
+                    requeue_stale_tasks()
+            except Exception:
+                logger.exception("Could not fetch the next task")
+                task = None
+
+            if task is not None:
+                run_task(task, stats)
+            elif burst:
+                return
+            else:
+                stop.wait(poll_interval)
+    finally:
+        close_old_connections()
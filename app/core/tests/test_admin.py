@@ -2,8 +2,14 @@
     Tests for django admin modifications.
 """
 
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from core.paginator import EstimatedCountPaginator, estimated_count
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
@@ -43,3 +49,110 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class UserOwnedAdminTests(TestCase):
+    """Tests for the recipe, tag and ingredient admin pages."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_login(self.admin_user)
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Tomato soup",
+            description="Slow cooked tomatoes.",
+            time_minutes=30,
+            price=Decimal("4.50"),
+        )
+        Recipe.objects.create(
+            user=self.user, title="Pancakes", time_minutes=15, price=Decimal("2.00")
+        )
+        Tag.objects.create(user=self.user, name="Dinner")
+        Ingredient.objects.create(user=self.user, name="Flour")
+
+    def test_changelists(self):
+        """Test the changelists are listed with estimated count paginators."""
+        for name, text in (("recipe", "Tomato soup"), ("tag", "Dinner"), ("ingredient", "Flour")):
+            with self.subTest(name=name):
+                res = self.client.get(reverse(f"admin:core_{name}_changelist"))
+
+                self.assertContains(res, text)
+                self.assertIsInstance(res.context["cl"].paginator, EstimatedCountPaginator)
+
+    def test_recipe_search_uses_full_text(self):
+        """Test searching recipes matches stemmed words in the description."""
+        url = reverse("admin:core_recipe_changelist")
+        res = self.client.get(url, {"q": "cook"})
+
+        self.assertEqual(list(res.context["cl"].result_list), [self.recipe])
+
+    def test_tag_search_by_owner_email(self):
+        """Test searching tags matches the owner's exact email."""
+        url = reverse("admin:core_tag_changelist")
+
+        res = self.client.get(url, {"q": "user@example.com"})
+        self.assertEqual(len(res.context["cl"].result_list), 1)
+
+        res = self.client.get(url, {"q": "admin@example.com"})
+        self.assertEqual(len(res.context["cl"].result_list), 0)
+
+    def test_user_delete_page_summarizes_counts(self):
+        """Test the delete confirmation counts owned rows and the deletion removes them."""
+        url = reverse("admin:core_user_delete", args=[self.user.id])
+
+        res = self.client.get(url)
+        self.assertContains(res, "Recipes: 2")
+
+        res = self.client.post(url, {"post": "yes"})
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Tag.objects.exists())
+
+    def test_recipe_change_page(self):
+        """Test the change page renders without loading every tag and ingredient."""
+        url = reverse("admin:core_recipe_change", args=[self.recipe.id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+
+
+class EstimatedCountTests(TestCase):
+    """Tests for estimated counts."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        Tag.objects.bulk_create(Tag(user=self.user, name=f"Tag {i}") for i in range(5))
+
+    def test_exact_count_below_threshold(self):
+        """Test small querysets are counted exactly without EXPLAIN."""
+        with CaptureQueriesContext(connection) as queries:
+            count = estimated_count(Tag.objects.all(), threshold=10)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(len(queries), 1)
+        self.assertIn("LIMIT 11", queries[0]["sql"])
+
+    def test_estimated_count_above_threshold(self):
+        """Test large querysets stop counting at the threshold and use the planner."""
+        with CaptureQueriesContext(connection) as queries:
+            count = estimated_count(Tag.objects.all(), threshold=2)
+
+        self.assertGreaterEqual(count, 3)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("LIMIT 3", queries[0]["sql"])
+        self.assertTrue(queries[1]["sql"].startswith("EXPLAIN"))
+
+    def test_paginator_counts_lists(self):
+        """Test the paginator still counts plain lists exactly."""
+        paginator = EstimatedCountPaginator(list(range(7)), 5)
+
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(paginator.num_pages, 2)
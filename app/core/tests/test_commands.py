@@ -2,12 +2,18 @@
     Test custom django management commands
 """
 
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
 
+from core.models import Recipe
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 
 @patch('core.management.commands.wait_for_db.Command.check')
 class CommandTests(SimpleTestCase):
@@ -27,4 +33,19 @@ class CommandTests(SimpleTestCase):
         patched_check.assert_called_with(databases=['default'])
 
 
-    
+class ImportRecipesCommandTests(TestCase):
+    def test_import_recipes_from_file(self):
+        user = get_user_model().objects.create_user('user@example.com', 'testpass123')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('title,time_minutes,price,tags\nPasta,15,6.00,Italian\n')
+        self.addCleanup(os.remove, file.name)
+
+        out = StringIO()
+        call_command('import_recipes', file.name, user='user@example.com', stdout=out)
+
+        self.assertIn('Imported 1 recipes', out.getvalue())
+        self.assertTrue(Recipe.objects.filter(user=user, title='Pasta').exists())
+
+    def test_import_recipes_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('import_recipes', 'missing.csv', user='nobody@example.com')
@@ -0,0 +1,120 @@
+"""
+    Tests for set-based deletion of users and recipes.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from core.deletion import delete_recipes, delete_tags, delete_user
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from recipe import cache, similarity
+from rest_framework.authtoken.models import Token
+
+
+def create_user_data(email, recipe_count=3):
+    """Create a user owning recipes linked to a tag and an ingredient."""
+    user = get_user_model().objects.create_user(email=email, password="testpass123")
+    tag = Tag.objects.create(user=user, name="Dinner")
+    ingredient = Ingredient.objects.create(user=user, name="Salt")
+    for i in range(recipe_count):
+        recipe = Recipe.objects.create(
+            user=user, title=f"Recipe {i}", time_minutes=10, price=Decimal("1.00")
+        )
+        recipe.tags.add(tag)
+        recipe.ingredients.add(ingredient)
+
+    return user
+
+
+class DeletionTests(TestCase):
+    """Tests for the deletion helpers."""
+
+    def setUp(self):
+        self.user = create_user_data("user@example.com")
+        self.other = create_user_data("other@example.com")
+
+    def assert_only_other_user_left(self):
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.pk).exists())
+        for model in (Recipe, Tag, Ingredient):
+            self.assertEqual(set(model.objects.values_list("user_id", flat=True)), {self.other.pk})
+        self.assertEqual(Recipe.tags.through.objects.count(), 3)
+        self.assertEqual(Recipe.ingredients.through.objects.count(), 3)
+
+    def test_delete_user(self):
+        """Test deleting a user removes everything they own and nothing else."""
+        delete_user(self.user)
+
+        self.assert_only_other_user_left()
+
+    def test_delete_user_matches_collector(self):
+        """Test the set-based path leaves the same rows as Django's collector."""
+        self.user.delete()
+
+        self.assert_only_other_user_left()
+
+    def test_delete_user_queries_independent_of_size(self):
+        """Test the number of queries does not grow with the number of recipes."""
+        big = create_user_data("big@example.com", recipe_count=20)
+        small = create_user_data("small@example.com", recipe_count=1)
+
+        with CaptureQueriesContext(connection) as big_queries:
+            delete_user(big)
+        with CaptureQueriesContext(connection) as small_queries:
+            delete_user(small)
+
+        self.assertEqual(len(big_queries), len(small_queries))
+
+    def test_delete_user_sends_user_and_token_signals(self):
+        """Test the user and token delete signals are still sent."""
+        Token.objects.create(user=self.user)
+        handler = mock.Mock()
+        post_delete.connect(handler)
+        self.addCleanup(post_delete.disconnect, handler)
+
+        delete_user(self.user)
+
+        senders = {call.kwargs["sender"] for call in handler.call_args_list}
+        self.assertEqual(senders, {get_user_model(), Token})
+
+    def test_delete_user_invalidates_cached_lists(self):
+        """Test the owner's cached tag and ingredient lists are invalidated."""
+        version = cache.get_version(self.user.pk)
+
+        delete_user(self.user)
+
+        self.assertNotEqual(cache.get_version(self.user.pk), version)
+
+    def test_delete_user_drops_similarity_index(self):
+        """Test the owner's similar-recipe index is dropped."""
+        similarity.get_index(self.user.pk)
+        self.addCleanup(similarity._indexes.clear)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_user(self.user)
+
+        self.assertNotIn(self.user.pk, similarity._indexes)
+
+    def test_delete_tags_drops_similarity_index(self):
+        """Test the indexes of the owners of deleted tags are dropped."""
+        similarity.get_index(self.user.pk)
+        self.addCleanup(similarity._indexes.clear)
+
+        delete_tags(Tag.objects.filter(user=self.user))
+
+        self.assertNotIn(self.user.pk, similarity._indexes)
+
+    def test_delete_recipes(self):
+        """Test deleting recipes removes their links but keeps tags and ingredients."""
+        recipes = Recipe.objects.filter(user=self.user, title__in=["Recipe 0", "Recipe 1"])
+
+        deleted = delete_recipes(recipes)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Recipe.tags.through.objects.count(), 4)
+        self.assertEqual(Recipe.ingredients.through.objects.count(), 4)
+        self.assertEqual(Tag.objects.count(), 2)
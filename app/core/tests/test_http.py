@@ -0,0 +1,92 @@
+"""
+    Tests for the JSON renderer, parser and response compression.
+"""
+import gzip
+import io
+from decimal import Decimal
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from app.middleware import CompressionMiddleware, brotli, choose_encoding
+from app.parsers import ORJSONParser
+from app.renderers import ORJSONRenderer
+
+COMPRESSION = {"MIN_SIZE": 100, "GZIP_LEVEL": 6, "BROTLI_QUALITY": 5}
+
+
+class RendererTests(SimpleTestCase):
+    def test_matches_standard_renderer(self):
+        """Test the output is byte-identical to DRF's renderer."""
+        recipe = {"id": 1, "title": "Crème brûlée \u2028", "price": "1.50", "tags": []}
+        data = {"results": [recipe], "next": None, "count": Decimal("2.5")}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output(self):
+        content = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+
+        self.assertEqual(content, JSONRenderer().render({"a": 1}, "application/json; indent=4"))
+
+
+class ParserTests(SimpleTestCase):
+    def test_parse(self):
+        data = ORJSONParser().parse(io.BytesIO('{"name": "Crème"}'.encode()))
+
+        self.assertEqual(data, {"name": "Crème"})
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{"))
+
+
+@override_settings(RESPONSE_COMPRESSION=COMPRESSION)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.body = b'{"title": "Recipe"}' * 100
+
+    def _process(self, accept_encoding, body=None):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        response = HttpResponse(self.body if body is None else body)
+        response["ETag"] = '"abc"'
+
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding("gzip"), "gzip")
+        self.assertEqual(choose_encoding("gzip;q=0, deflate"), None)
+        self.assertEqual(choose_encoding(""), None)
+        if brotli is not None:
+            self.assertEqual(choose_encoding("gzip, br"), "br")
+            self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+            self.assertEqual(choose_encoding("*"), "br")
+
+    def test_gzip(self):
+        response = self._process("gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_brotli(self):
+        if brotli is None:
+            self.skipTest("brotli is not installed")
+        response = self._process("br, gzip")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.body)
+
+    def test_small_response_not_compressed(self):
+        response = self._process("gzip", body=b"{}")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"{}")
+
+    def test_identity_only(self):
+        response = self._process("identity")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
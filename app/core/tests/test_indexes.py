@@ -0,0 +1,43 @@
+"""
+    Tests for the per-user database indexes.
+"""
+from core import models
+from core.tests.utils import used_indexes
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max
+from django.test import TestCase
+
+
+class IndexUsageTests(TestCase):
+    """Test the list queries are answered from the composite indexes."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+
+    def test_recipe_list_uses_user_id_index(self):
+        queryset = models.Recipe.objects.filter(user=self.user).order_by("-id")[:50]
+
+        self.assertIn("recipe_user_id_desc_idx", used_indexes(queryset))
+
+    def test_tag_list_uses_user_name_index(self):
+        queryset = models.Tag.objects.filter(user=self.user).order_by("-name")[:50]
+
+        self.assertIn("unique_tag_name_per_user", used_indexes(queryset))
+
+    def test_ingredient_list_uses_user_name_index(self):
+        queryset = models.Ingredient.objects.filter(user=self.user).order_by("-name")[:50]
+
+        self.assertIn("ingredient_user_name_idx", used_indexes(queryset))
+
+    def test_collection_state_uses_updated_at_indexes(self):
+        """Test the count and last modification time of each list come from an index."""
+        for model in (models.Recipe, models.Tag, models.Ingredient):
+            queryset = (
+                model.objects.filter(user=self.user)
+                .values("user")
+                .annotate(count=Count("*"), last_modified=Max("updated_at"))
+            )
+            with self.subTest(model=model.__name__):
+                self.assertIn(
+                    f"{model._meta.model_name}_user_updated_at_idx", used_indexes(queryset)
+                )
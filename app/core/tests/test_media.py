@@ -0,0 +1,147 @@
+"""
+    Tests for serving media files.
+"""
+import os
+import shutil
+import tempfile
+
+from django.http import FileResponse
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from app.media import parse_range
+
+DIGEST = "0f" * 32
+CONTENT = bytes(range(256)) * 4
+
+
+class ServeMediaTests(SimpleTestCase):
+    """Tests for the media view."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT="")
+        media.enable()
+        self.addCleanup(media.disable)
+
+        os.makedirs(os.path.join(self.media_root, "recipes"))
+        self.path = os.path.join(self.media_root, "recipes", f"{DIGEST}.jpg")
+        with open(self.path, "wb") as file:
+            file.write(CONTENT)
+        self.url = f"/media/recipes/{DIGEST}.jpg"
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        self.addCleanup(response.close)
+
+        return response
+
+    def test_serve_file(self):
+        """Test files are served as file responses cached for good."""
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["ETag"], f'"{DIGEST}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_not_modified(self):
+        """Test conditional requests are answered with 304 and the cache headers."""
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": f'"{DIGEST}"'},
+            {"HTTP_IF_MODIFIED_SINCE": http_date(os.stat(self.path).st_mtime + 60)},
+        ):
+            with self.subTest(headers=headers):
+                response = self.get(**headers)
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], f'"{DIGEST}"')
+                self.assertIn("immutable", response["Cache-Control"])
+
+    def test_range(self):
+        """Test a byte range is served as partial content."""
+        response = self.get(HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        # A file_wrapper would send the whole file with sendfile() given a file number.
+        self.assertFalse(hasattr(response.file_to_stream, "fileno"))
+
+    def test_whole_file_range(self):
+        """Test a range covering the whole file sends the file itself."""
+        response = self.get(HTTP_RANGE="bytes=0-")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["Content-Range"], f"bytes 0-1023/{len(CONTENT)}")
+        self.assertTrue(hasattr(response.file_to_stream, "fileno"))
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE="bytes=-5")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-5:])
+
+    def test_range_not_satisfiable(self):
+        response = self.get(HTTP_RANGE=f"bytes={len(CONTENT)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_if_range_mismatch_sends_whole_file(self):
+        """Test a Range with a stale If-Range validator is ignored."""
+        response = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/")
+    def test_accel_redirect(self):
+        """Test the file is left to the proxy when an internal location is configured."""
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/recipes/{DIGEST}.jpg")
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_missing_and_outside_files(self):
+        """Test missing files and paths outside the media root are not found."""
+        for url in ("/media/recipes/missing.jpg", "/media/recipes", "/media/../settings.py"):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, 404)
+
+    def test_post_not_allowed(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_parse_range(self):
+        cases = {
+            "bytes=0-99": (0, 99),
+            "bytes=10-": (10, 999),
+            "bytes=-100": (900, 999),
+            "bytes=-2000": (0, 999),
+            "bytes=900-5000": (900, 999),
+            "bytes=5-2": None,
+            "bytes=0-1,5-6": None,
+            "items=0-1": None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=1000-1200", "bytes=-0"):
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    parse_range(header, 1000)
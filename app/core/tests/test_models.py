@@ -2,6 +2,7 @@ from decimal import Decimal
 
 from core import models
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
 
 
@@ -61,6 +62,16 @@ class ModelTests(TestCase):
 
         self.assertEqual(tag.name, str(tag))
 
+    def test_tag_name_unique_per_user(self):
+        """Test a user cannot have two tags with the same name."""
+        user = create_user()
+        other_user = create_user(email="other@example.com")
+        models.Tag.objects.create(user=user, name="Tag 1")
+        models.Tag.objects.create(user=other_user, name="Tag 1")
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name="Tag 1")
+
     def test_create_ingredient(self):
         """Test creating an ingredient."""
         user = create_user()
@@ -0,0 +1,74 @@
+"""
+    Tests for the precomputed OpenAPI schema.
+"""
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+SCHEMA_URL = reverse("api-schema")
+
+
+class PrecomputedSchemaTests(TestCase):
+    """Test building and serving the schema file."""
+
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        settings_override = override_settings(API_SCHEMA_DIR=self.schema_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+    def _build(self):
+        call_command("build_schema", stdout=StringIO())
+
+    def test_serves_built_schema(self):
+        """Test the built file is served with caching headers."""
+        self._build()
+
+        response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("/api/recipe/recipes/", json.loads(response.content)["paths"])
+        self.assertIn("ETag", response)
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_matching_etag_not_modified(self):
+        self._build()
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        response = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_operation_ids_unique(self):
+        """Test no two operations of the built schema share an operationId."""
+        self._build()
+
+        paths = json.loads(self.client.get(SCHEMA_URL, {"format": "json"}).content)["paths"]
+        operation_ids = [
+            operation["operationId"] for path in paths.values() for operation in path.values()
+        ]
+
+        self.assertIn("recipe_recipes_bulk_clone", operation_ids)
+        self.assertEqual(len(operation_ids), len(set(operation_ids)))
+
+    @override_settings(DEBUG=True)
+    def test_live_schema_in_debug(self):
+        """Test the schema is generated live in DEBUG when no file was built."""
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+
+    @override_settings(DEBUG=False)
+    def test_missing_schema_outside_debug(self):
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
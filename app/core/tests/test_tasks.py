@@ -0,0 +1,137 @@
+"""
+    Tests for the database-backed task queue.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from core import tasks
+from core.models import Tag, Task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+calls = []
+
+
+@tasks.task
+def record_call(value):
+    calls.append(value)
+
+
+@tasks.task
+def create_tag(user_id, name):
+    Tag.objects.create(user_id=user_id, name=name)
+    raise RuntimeError("Failed after writing.")
+
+
+class TaskQueueTests(TestCase):
+    """Tests for enqueueing and running tasks."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Test delayed calls run once and their rows are deleted."""
+        record_call.delay(value=1)
+        record_call.delay(value=2)
+
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(tasks.run_tasks(), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_delay_kwargs_do_not_clash(self):
+        """Test task arguments named like enqueue() options are passed to the task."""
+        task = record_call.delay(value=1, run_at="soon", max_attempts="many")
+
+        self.assertEqual(task.kwargs, {"value": 1, "run_at": "soon", "max_attempts": "many"})
+
+    def test_unknown_task(self):
+        with self.assertRaises(KeyError):
+            tasks.enqueue("core.tests.missing")
+
+    def test_future_tasks_wait(self):
+        """Test tasks only run once they are due."""
+        tasks.enqueue(
+            record_call.task_name, {"value": 1}, run_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertEqual(tasks.run_tasks(), 0)
+        self.assertEqual(calls, [])
+
+    @override_settings(TASK_QUEUE={**settings.TASK_QUEUE, "MAX_ATTEMPTS": 2, "RETRY_DELAY": 10})
+    def test_retry_with_backoff_then_fail(self):
+        """Test failing tasks are rolled back, retried later and finally marked failed."""
+        user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        task = create_tag.delay(user_id=user.id, name="Dinner")
+        stats = tasks.WorkerStats()
+
+        before = timezone.now()
+        self.assertEqual(tasks.run_tasks(stats), 1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreaterEqual(task.run_at, before + timedelta(seconds=10))
+        self.assertLessEqual(task.run_at, timezone.now() + timedelta(seconds=15))
+        self.assertIn("RuntimeError", task.last_error)
+        self.assertFalse(Tag.objects.exists())
+
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        tasks.run_tasks(stats)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+        self.assertEqual(tasks.run_tasks(stats), 0)
+        self.assertEqual(stats.as_dict()["retried"], 1)
+        self.assertEqual(stats.as_dict()["failed"], 1)
+
+    @override_settings(TASK_QUEUE={**settings.TASK_QUEUE, "TIMEOUT": 60})
+    def test_requeue_stale_tasks(self):
+        """Test running tasks abandoned by their worker are queued again."""
+        stale = record_call.delay(value=1)
+        fresh = record_call.delay(value=2)
+        Task.objects.filter(pk=stale.pk).update(
+            status=Task.RUNNING, locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        Task.objects.filter(pk=fresh.pk).update(status=Task.RUNNING, locked_at=timezone.now())
+
+        self.assertEqual(tasks.requeue_stale_tasks(), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Task.PENDING)
+        self.assertIsNone(stale.locked_at)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, Task.RUNNING)
+
+    @override_settings(TASK_QUEUE={**settings.TASK_QUEUE, "TIMEOUT": 60})
+    def test_stale_tasks_out_of_attempts_fail(self):
+        """Test tasks whose workers died on every attempt are not queued again."""
+        task = tasks.enqueue(record_call.task_name, {"value": 1}, max_attempts=2)
+        Task.objects.filter(pk=task.pk).update(
+            status=Task.RUNNING, attempts=2, locked_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(tasks.requeue_stale_tasks(), 0)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertIsNone(task.locked_at)
+        self.assertIn("worker", task.last_error)
+
+    def test_retry_delay_grows(self):
+        self.assertLess(tasks.retry_delay(3), tasks.retry_delay(5))
+
+
+class RunWorkerCommandTests(TestCase):
+    @patch("core.tasks.work")
+    def test_run_worker_threads(self, patched_work):
+        """Test the command starts one worker per concurrency slot and reports stats."""
+        out = StringIO()
+
+        call_command("run_worker", "--concurrency", "3", "--burst", stdout=out)
+
+        self.assertEqual(patched_work.call_count, 3)
+        self.assertTrue(all(call.args[2] for call in patched_work.call_args_list))
+        self.assertIn("0 succeeded, 0 retried, 0 failed", out.getvalue())
+        self.assertIn("recipe.images.generate_thumbnail", out.getvalue())
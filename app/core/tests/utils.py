@@ -0,0 +1,42 @@
+"""
+    Helpers for inspecting query plans in tests.
+"""
+from contextlib import contextmanager
+
+from core.paginator import query_plan
+from django.db import connection
+
+PLANNER_SETTINGS = ("enable_seqscan", "enable_bitmapscan", "enable_sort")
+
+
+@contextmanager
+def prefer_indexes(settings=PLANNER_SETTINGS):
+    """Discourage plans that avoid indexes, as tiny test tables never need them."""
+    with connection.cursor() as cursor:
+        for name in settings:
+            cursor.execute(f"SET {name} = off")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name in settings:
+                cursor.execute(f"RESET {name}")
+
+
+def _plan_nodes(node):
+    """Yield every node of an EXPLAIN plan tree."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def used_indexes(queryset, settings=PLANNER_SETTINGS):
+    """Return the names of the indexes scanned by the queryset's plan.
+
+    GIN indexes are only read through bitmap scans, leave enable_bitmapscan out of
+    settings when checking them.
+    """
+    with prefer_indexes(settings):
+        plan = query_plan(queryset)
+
+    return {node["Index Name"] for node in _plan_nodes(plan) if "Index Name" in node}
@@ -0,0 +1,217 @@
+"""
+    Benchmarks of the recipe APIs, run with "manage.py benchmark <name>".
+
+    Each benchmark creates its own data, the command rolls it back afterwards.
+"""
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from core.deletion import delete_user
+from core.models import Recipe, Tag
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from PIL import Image
+from recipe.fastpath import list_values, represent_rows
+from recipe.importer import import_recipes, read_ndjson
+from recipe.serializers import RecipeSerializer
+from recipe.similarity import SimilarityIndex
+from recipe.thumbnails import make_thumbnail
+from rest_framework.renderers import JSONRenderer
+
+from app.middleware import brotli
+from app.renderers import ORJSONRenderer
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Register a benchmark under the function's name."""
+    BENCHMARKS[func.__name__] = func
+
+    return func
+
+
+def best_of(repeat, func, *args):
+    """Return the fastest of repeat runs of func in seconds, and its last result."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+
+    return min(timings), result
+
+
+def create_recipes(size, tags_per_recipe=3, tag_count=20):
+    """Create a user with size recipes linked to a few shared tags."""
+    user = get_user_model().objects.create_user(f"benchmark-{time.time_ns()}@example.com")
+    tags = Tag.objects.bulk_create([Tag(user=user, name=f"Tag {i}") for i in range(tag_count)])
+    recipes = Recipe.objects.bulk_create(
+        [
+            Recipe(
+                user=user,
+                title=f"Recipe {i}",
+                description="Benchmark recipe " * 20,
+                time_minutes=i % 120,
+                price=Decimal(i % 10000) / 100,
+                link=f"https://example.com/recipes/{i}",
+            )
+            for i in range(size)
+        ]
+    )
+    through = Recipe.tags.through
+    through.objects.bulk_create(
+        [
+            through(recipe_id=recipe.pk, tag_id=tags[(i + j) % tag_count].pk)
+            for i, recipe in enumerate(recipes)
+            for j in range(tags_per_recipe)
+        ]
+    )
+
+    return user
+
+
+@benchmark
+def serializers(size, repeat, stdout):
+    """Compare the serializer and values() based list paths for one page of recipes."""
+    user = create_recipes(size)
+    queryset = Recipe.objects.filter(user=user).order_by("-id")
+    renderer = JSONRenderer()
+
+    def standard():
+        recipes = queryset.prefetch_related(Prefetch("tags", queryset=Tag.objects.order_by("id")))
+        return renderer.render(RecipeSerializer(recipes, many=True).data)
+
+    def fast():
+        serializer = RecipeSerializer()
+        return renderer.render(represent_rows(serializer, list_values(queryset, serializer)))
+
+    standard_time, standard_bytes = best_of(repeat, standard)
+    fast_time, fast_bytes = best_of(repeat, fast)
+
+    stdout.write(f"serializers: {standard_time * 1000:.1f} ms for {size} recipes")
+    stdout.write(f"values():    {fast_time * 1000:.1f} ms for {size} recipes")
+    stdout.write(f"speedup:     {standard_time / fast_time:.1f}x")
+    stdout.write(f"identical:   {standard_bytes == fast_bytes}")
+
+
+@benchmark
+def renderers(size, repeat, stdout):
+    """Compare JSON renderers and response compression for a page of recipes."""
+    user = create_recipes(size)
+    queryset = Recipe.objects.filter(user=user).order_by("-id")
+    serializer = RecipeSerializer()
+    rows = represent_rows(serializer, list_values(queryset, serializer))
+    data = {"next": None, "previous": None, "results": rows}
+
+    for renderer in (JSONRenderer(), ORJSONRenderer()):
+        elapsed, content = best_of(repeat, renderer.render, data)
+        stdout.write(
+            f"{type(renderer).__name__:<16} {elapsed * 1000:7.2f} ms {len(content):>9} bytes"
+        )
+
+    options = settings.RESPONSE_COMPRESSION
+    codecs = {"gzip": lambda body: gzip.compress(body, options["GZIP_LEVEL"], mtime=0)}
+    if brotli is not None:
+        codecs["br"] = lambda body: brotli.compress(body, quality=options["BROTLI_QUALITY"])
+    for name, compress in codecs.items():
+        elapsed, compressed = best_of(repeat, compress, content)
+        stdout.write(f"{name:<16} {elapsed * 1000:7.2f} ms {len(compressed):>9} bytes on the wire")
+
+
+@benchmark
+def deletion(size, repeat, stdout):
+    """Compare Django's collector with set-based deletes for a user with size recipes."""
+    for name, delete in (("collector", lambda user: user.delete()), ("set-based", delete_user)):
+        timings = []
+        for _ in range(repeat):
+            user = create_recipes(size)
+            started = time.perf_counter()
+            delete(user)
+            timings.append(time.perf_counter() - started)
+
+        stdout.write(f"{name:<10} {min(timings) * 1000:9.1f} ms for {size} recipes")
+
+
+@benchmark
+def thumbnails(size, repeat, stdout):
+    """Measure thumbnail throughput of size photo-sized images with growing process pools."""
+    thumbnail_size = settings.RECIPE_THUMBNAIL_SIZE
+    with tempfile.TemporaryDirectory() as directory:
+        sources = []
+        for i in range(size):
+            source = os.path.join(directory, f"{i}.jpg")
+            Image.effect_noise((2400, 1600), 32 + i % 64).convert("RGB").save(source, quality=90)
+            sources.append(source)
+        jobs = [
+            (source, os.path.join(directory, "thumbnails", f"{i}.jpg"), thumbnail_size)
+            for i, source in enumerate(sources)
+        ]
+
+        def run(workers):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(make_thumbnail, *zip(*jobs)))
+
+        workers = 1
+        while True:
+            elapsed, _ = best_of(repeat, run, workers)
+            stdout.write(f"{workers:>3} workers {size / elapsed:9.1f} thumbnails/s")
+            if workers >= (os.cpu_count() or 1):
+                break
+            workers = min(workers * 2, os.cpu_count())
+
+
+@benchmark
+def similarity(size, repeat, stdout):
+    """Measure building a user's similarity index and looking up similar recipes in it."""
+    user = create_recipes(size)
+    build_time, index = best_of(repeat, SimilarityIndex.build, user.pk)
+
+    timings = []
+    for recipe_id in random.sample(list(index.rows), min(size, 100 * repeat)):
+        started = time.perf_counter()
+        index.similar(recipe_id, settings.RECIPE_SIMILARITY["LIMIT"])
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    stdout.write(f"build:  {build_time * 1000:9.1f} ms for {size} recipes")
+    stdout.write(
+        f"lookup: {timings[len(timings) // 2] * 1000:9.2f} ms median, "
+        f"{timings[-1] * 1000:.2f} ms max over {len(timings)} recipes"
+    )
+
+
+@benchmark
+def imports(size, repeat, stdout):
+    """Measure importing an NDJSON file of size recipes, the target is 50,000 rows/min."""
+    lines = [
+        json.dumps(
+            {
+                "title": f"Recipe {i}",
+                "description": "Benchmark recipe " * 20,
+                "time_minutes": i % 120,
+                "price": str(Decimal(i % 10000) / 100),
+                "link": f"https://example.com/recipes/{i}",
+                "tags": [f"Tag {(i + j) % 20}" for j in range(3)],
+            }
+        )
+        + "\n"
+        for i in range(size)
+    ]
+
+    def run():
+        user = get_user_model().objects.create_user(f"benchmark-{time.time_ns()}@example.com")
+        return import_recipes(user, read_ndjson(lines))
+
+    elapsed, result = best_of(repeat, run)
+    stdout.write(
+        f"import: {elapsed * 1000:9.1f} ms for {result.created} recipes, "
+        f"{size / elapsed * 60:,.0f} rows/min"
+    )
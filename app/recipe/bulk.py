@@ -0,0 +1,77 @@
+"""
+    Bulk delete and rename actions for the user's tags, ingredients and recipes.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from recipe import cache, serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class BulkChangeMixin:
+    """Delete or rename many objects of the user with one set-based statement per table.
+
+    Ids of objects that do not exist or belong to other users are ignored, the
+    responses count the rows actually affected.
+    """
+
+    rename_serializer_class = None
+    # Set-based helper from core.deletion taking the queryset to delete and returning
+    # the number of deleted objects, Django's collector is used without one.
+    bulk_delete_function = None
+    # Set on viewsets whose lists are cached per user, see recipe.cache.
+    invalidates_cached_lists = False
+
+    def get_bulk_queryset(self, ids):
+        return self.queryset.model.objects.filter(user=self.request.user, pk__in=ids)
+
+    def perform_bulk_delete(self, queryset):
+        """Delete the objects of the queryset and return how many were deleted."""
+        if self.bulk_delete_function is not None:
+            return self.bulk_delete_function(queryset)
+
+        _, deleted = queryset.delete()
+        return deleted.get(queryset.model._meta.label, 0)
+
+    def bulk_changed(self):
+        if self.invalidates_cached_lists:
+            cache.invalidate(self.request.user.pk)
+
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request):
+        """Delete the objects with the given ids."""
+        serializer = serializers.BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            deleted = self.perform_bulk_delete(
+                self.get_bulk_queryset(serializer.validated_data["ids"])
+            )
+            self.bulk_changed()
+
+        return Response({"deleted": deleted})
+
+    @action(detail=False, methods=["post"], url_path="bulk-rename")
+    def bulk_rename(self, request):
+        """Rename the objects with the given ids in a single UPDATE."""
+        serializer = self.rename_serializer_class(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        field_name = next(name for name in serializer.child.fields if name != "id")
+        field = self.queryset.model._meta.get_field(field_name)
+        names = {item["id"]: item[field_name] for item in serializer.validated_data}
+        value = Case(
+            *(When(pk=pk, then=Value(name)) for pk, name in names.items()), output_field=field
+        )
+        try:
+            with transaction.atomic():
+                updated = self.get_bulk_queryset(names).update(
+                    **{field_name: value, "updated_at": timezone.now()}
+                )
+                self.bulk_changed()
+        except IntegrityError:
+            raise ValidationError({field_name: ["Names must be unique."]})
+
+        return Response({"updated": updated})
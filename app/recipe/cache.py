@@ -0,0 +1,146 @@
+"""
+    Per-user cache of the rendered tag and ingredient lists.
+
+    Invalidation bumps a per-user version stored in the same cache, so it only reaches
+    other processes when the cache is shared. Entries of a process-local cache expire
+    after RECIPE_LIST_CACHE["LOCAL_TIMEOUT"] seconds instead, which bounds how long
+    other processes serve outdated lists.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """Thread-safe hit and miss counters, logged every STATS_INTERVAL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.logged_at = time.monotonic()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            now = time.monotonic()
+            if now - self.logged_at < settings.RECIPE_LIST_CACHE["STATS_INTERVAL"]:
+                return
+            self.logged_at = now
+            hits, misses = self.hits, self.misses
+
+        logger.info(
+            "List cache: %d hits, %d misses, %.0f%% hit rate",
+            hits,
+            misses,
+            100 * hits / (hits + misses),
+        )
+
+    def as_dict(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[settings.RECIPE_LIST_CACHE["ALIAS"]]
+
+
+def get_timeout():
+    """Return how long list responses are cached, see the module docstring."""
+    options = settings.RECIPE_LIST_CACHE
+    if isinstance(get_cache(), LocMemCache):
+        return min(options["TIMEOUT"], options["LOCAL_TIMEOUT"])
+
+    return options["TIMEOUT"]
+
+
+def _version_key(user_id):
+    return f"recipe:lists:version:{user_id}"
+
+
+def get_version(user_id):
+    """Return the current generation of the user's cached lists."""
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from a fresh value so entries written before an eviction are never reused.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def _bump(user_id):
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def invalidate(user_id):
+    """Invalidate every cached list of the user.
+
+    The version is bumped right away and again on commit, so a concurrent request
+    cannot store data read before the commit under the new version.
+    """
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+class CachedListMixin:
+    """Serve JSON list responses from the per-user cache."""
+
+    def get_list_cache_key(self):
+        request = self.request
+        # Accept parameters such as "; indent=4" change the rendering of the same path.
+        variant = f"{request.accepted_media_type}|{request.get_full_path()}"
+        path = hashlib.sha1(variant.encode()).hexdigest()
+        version = get_version(request.user.pk)
+
+        return f"recipe:lists:{self.basename}:{request.user.pk}:{version}:{path}"
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_list_cache_key()
+        cached = get_cache().get(key)
+        stats.record(hit=cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().list(request, *args, **kwargs)
+        response.list_cache_key = key
+
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(response, "list_cache_key", None)
+        if key is not None and response.status_code == 200:
+            response.render()
+            get_cache().set(key, (response.content, response["Content-Type"]), get_timeout())
+
+        return response
@@ -0,0 +1,68 @@
+"""
+    Cloning of recipes with their tag and ingredient links.
+"""
+from core.models import Recipe
+from django.db import connection
+from recipe import similarity
+
+# Columns copied from the source recipes, search_vector is set by its trigger.
+COPIED_COLUMNS = (
+    "user_id",
+    "title",
+    "description",
+    "time_minutes",
+    "price",
+    "link",
+    "image",
+    "thumbnail",
+)
+
+
+def clone_recipes(user, recipe_ids):
+    """Clone the user's recipes with the given ids, return (source id, clone id) pairs.
+
+    Pairs are in the order of recipe_ids, ids of other users' recipes are skipped.
+    Everything is copied by a single statement: clone ids are drawn from the sequence
+    first, so the recipes and their links are inserted without reading anything back.
+    """
+    recipe_table = Recipe._meta.db_table
+    tags_table = Recipe.tags.through._meta.db_table
+    ingredients_table = Recipe.ingredients.through._meta.db_table
+    columns = ", ".join(COPIED_COLUMNS)
+    source_columns = ", ".join(f"recipe.{column}" for column in COPIED_COLUMNS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH clones AS (
+                SELECT
+                    recipe.id AS source_id,
+                    nextval(pg_get_serial_sequence(%s, 'id')) AS id,
+                    ids.position
+                FROM unnest(%s::bigint[]) WITH ORDINALITY AS ids(id, position)
+                JOIN {recipe_table} recipe ON recipe.id = ids.id AND recipe.user_id = %s
+            ),
+            recipes AS (
+                INSERT INTO {recipe_table} (id, {columns}, updated_at)
+                SELECT clones.id, {source_columns}, now()
+                FROM clones JOIN {recipe_table} recipe ON recipe.id = clones.source_id
+            ),
+            tags AS (
+                INSERT INTO {tags_table} (recipe_id, tag_id)
+                SELECT clones.id, link.tag_id
+                FROM clones JOIN {tags_table} link ON link.recipe_id = clones.source_id
+            ),
+            ingredients AS (
+                INSERT INTO {ingredients_table} (recipe_id, ingredient_id)
+                SELECT clones.id, link.ingredient_id
+                FROM clones JOIN {ingredients_table} link ON link.recipe_id = clones.source_id
+            )
+            SELECT source_id, id FROM clones ORDER BY position
+            """,
+            [recipe_table, list(recipe_ids), user.pk],
+        )
+        pairs = cursor.fetchall()
+
+    similarity.invalidate(user.pk)
+
+    return pairs
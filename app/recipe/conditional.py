@@ -0,0 +1,81 @@
+"""
+    Conditional GET support for the recipe list endpoints.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def collection_state(*querysets):
+    """Return a version string and the last modification time of the querysets' rows.
+
+    Row counts catch deletions, which leave the maximum updated_at untouched. Both are
+    read from the (user, updated_at) indexes alone for querysets filtered by user.
+    """
+    parts = []
+    last_modified = None
+    for queryset in querysets:
+        state = queryset.aggregate(count=Count("*"), last_modified=Max("updated_at"))
+        parts.append(f"{state['count']}:{state['last_modified']}")
+        if state["last_modified"] and (
+            last_modified is None or state["last_modified"] > last_modified
+        ):
+            last_modified = state["last_modified"]
+
+    return "|".join(parts), last_modified
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+class ConditionalListMixin:
+    """Answer list requests with 304 when the client's ETag is still current.
+
+    The collection is the view's queryset, views listing rows of other tables too
+    override get_collection_state().
+    """
+
+    def get_collection_state(self):
+        """Return the (version, last_modified) pair of the collection, see collection_state()."""
+        return collection_state(self.get_queryset().order_by())
+
+    def get_list_etag(self, version):
+        """Return a strong ETag for the current page of the collection."""
+        request = self.request
+        key = ":".join(
+            (
+                str(request.user.pk),
+                request.accepted_media_type,
+                request.get_full_path(),
+                version,
+            )
+        )
+
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        version, last_modified = self.get_collection_state()
+        etag = self.get_list_etag(version)
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or _strip_weak(etag) in {_strip_weak(tag) for tag in parse_etags(if_none_match)}
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept",))
+        # Deletions do not move Last-Modified, so clients must revalidate with the ETag.
+        response["Cache-Control"] = "private, no-cache"
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+
+        return response
@@ -0,0 +1,72 @@
+"""
+    Query parameter filters for the recipe list.
+"""
+from decimal import Decimal, InvalidOperation
+
+from core.models import Recipe
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+
+# Query parameter -> (relation, whether every id has to be linked).
+RELATED_FILTERS = {
+    "tags": ("tags", False),
+    "tags_all": ("tags", True),
+    "ingredients": ("ingredients", False),
+    "ingredients_all": ("ingredients", True),
+}
+
+# Query parameter -> (lookup, value parser).
+RANGE_FILTERS = {
+    "price_min": ("price__gte", Decimal),
+    "price_max": ("price__lte", Decimal),
+    "time_min": ("time_minutes__gte", int),
+    "time_max": ("time_minutes__lte", int),
+}
+
+
+def _parse(params, name, parser):
+    try:
+        return parser(params[name])
+    except (ValueError, InvalidOperation):
+        raise ValidationError({name: [f"Invalid value: {params[name]!r}."]})
+
+
+def _parse_ids(params, name):
+    """Return the distinct ids of a comma separated query parameter."""
+    try:
+        return list(dict.fromkeys(int(value) for value in params[name].split(",") if value))
+    except ValueError:
+        raise ValidationError({name: ["Expected a comma separated list of ids."]})
+
+
+def _linked(relation, ids):
+    """Return an EXISTS condition matching recipes linked to any of the ids."""
+    field = Recipe._meta.get_field(relation)
+    links = field.remote_field.through.objects.filter(
+        **{field.m2m_field_name(): OuterRef("pk"), f"{field.m2m_reverse_name()}__in": ids}
+    )
+
+    return Exists(links)
+
+
+def filter_recipes(queryset, params):
+    """Apply the filters given in the query parameters.
+
+    Relations are matched with EXISTS subqueries, so recipes linked to several of
+    the ids are never duplicated.
+    """
+    for name, (relation, match_all) in RELATED_FILTERS.items():
+        if not params.get(name):
+            continue
+        ids = _parse_ids(params, name)
+        if match_all:
+            for id_ in ids:
+                queryset = queryset.filter(_linked(relation, [id_]))
+        elif ids:
+            queryset = queryset.filter(_linked(relation, ids))
+
+    for name, (lookup, parser) in RANGE_FILTERS.items():
+        if params.get(name):
+            queryset = queryset.filter(**{lookup: _parse(params, name, parser)})
+
+    return queryset
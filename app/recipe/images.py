@@ -0,0 +1,140 @@
+"""
+    Storage of recipe images and generation of their thumbnails by the task queue.
+
+    Images are stored under the SHA-256 of their content, so identical uploads share
+    one file and one thumbnail. Files are never deleted when recipes change because
+    other recipes may still use them.
+"""
+import hashlib
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.models import Recipe
+from core.tasks import task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.utils import timezone
+from PIL import Image
+from recipe.thumbnails import make_thumbnail
+
+# Pillow format names of the accepted images and the extensions they are stored with.
+FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def image_format(file):
+    """Return the format of an image read from its header, or None if it is not accepted."""
+    try:
+        # Opening is lazy, only the header is read.
+        with Image.open(file) as image:
+            name = image.format
+    except (OSError, Image.DecompressionBombError):
+        return None
+    finally:
+        file.seek(0)
+
+    return name if name in FORMATS else None
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploaded files to temporary files, giving up once one exceeds max_size.
+
+    The rest of the request body is left unread, too_large tells the view why the
+    file is missing.
+    """
+
+    def __init__(self, request, max_size):
+        super().__init__(request)
+        self.max_size = max_size
+        self.received = 0
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        self.received = 0
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.too_large = True
+            raise StopUpload(connection_reset=True)
+
+        return super().receive_data_chunk(raw_data, start)
+
+
+def content_name(file, extension):
+    """Return the storage name of a file derived from the hash of its content."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+
+    return f"recipes/{digest.hexdigest()}.{extension}"
+
+
+def thumbnail_name(image_name):
+    """Return the storage name of the thumbnail of an image."""
+    stem = posixpath.splitext(posixpath.basename(image_name))[0]
+    return f"recipes/thumbnails/{stem}-{settings.RECIPE_THUMBNAIL_SIZE}.jpg"
+
+
+def get_executor():
+    """Return the process pool rendering thumbnails, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned rather than forked from the multithreaded worker, the processes
+            # only import recipe.thumbnails.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.RECIPE_THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    return _executor
+
+
+def attach_image(recipe, upload):
+    """Store an uploaded image, see image_format(), and queue its thumbnail.
+
+    The upload is moved into storage without being read into memory when it was
+    streamed to a temporary file.
+    """
+    name = content_name(upload, FORMATS[image_format(upload)])
+    if not default_storage.exists(name):
+        name = default_storage.save(name, upload)
+
+    thumbnail = thumbnail_name(name)
+    recipe.image = name
+    recipe.thumbnail = thumbnail if default_storage.exists(thumbnail) else None
+    recipe.save(update_fields=["image", "thumbnail", "updated_at"])
+
+    if not recipe.thumbnail:
+        generate_thumbnail.delay(recipe_id=recipe.pk, image_name=name)
+
+
+@task
+def generate_thumbnail(recipe_id, image_name):
+    """Render the thumbnail of a recipe image and point the recipe at it.
+
+    Rendering runs in the process pool so that worker threads use every core.
+    """
+    target_name = thumbnail_name(image_name)
+    args = (
+        default_storage.path(image_name),
+        default_storage.path(target_name),
+        settings.RECIPE_THUMBNAIL_SIZE,
+    )
+    if settings.RECIPE_THUMBNAIL_WORKERS == 0:
+        make_thumbnail(*args)
+    else:
+        get_executor().submit(make_thumbnail, *args).result()
+
+    # The image may have been replaced meanwhile.
+    Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        thumbnail=target_name, updated_at=timezone.now()
+    )
@@ -0,0 +1,259 @@
+"""
+    Bulk import of recipes through PostgreSQL COPY.
+
+    Rows are validated one at a time while streaming, and the valid ones are
+    copied into a temporary staging table. Tags, recipes and tag links are then
+    written with one INSERT ... SELECT each. Invalid rows, including values PostgreSQL
+    cannot store such as NUL characters, are reported and skipped. Only a failure of
+    the copy itself aborts the whole import with ImportFailed.
+"""
+import csv
+import io
+import json
+import logging
+import re
+import time
+
+from core.models import Recipe, Tag
+from django.core.exceptions import ValidationError
+from django.core.validators import ProhibitNullCharactersValidator
+from django.db import DataError, IntegrityError, connection, transaction
+from recipe import cache, similarity
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+RECIPE_FIELDS = ("title", "description", "time_minutes", "price", "link")
+REQUIRED_FIELDS = ("title", "time_minutes", "price")
+CSV_TAG_SEPARATOR = "|"
+STAGING_TABLE = "recipe_import"
+COPY_CONTEXT_LINE = re.compile(r"\bline (\d+)")
+
+prohibit_null_characters = ProhibitNullCharactersValidator()
+
+
+class ImportFailed(Exception):
+    """The database refused the copied data, nothing was imported."""
+
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}" if line else message)
+        self.line = line
+
+
+class ImportResult:
+    """Outcome of an import: number of created recipes and per-row errors."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {"created": self.created, "errors": self.errors}
+
+
+def read_ndjson(lines):
+    """Yield (line number, row) pairs, row is None for lines that are not JSON objects."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def read_csv(lines):
+    """Yield (line number, row) pairs from CSV with a header, tags separated by "|"."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        tags = row.get("tags") or ""
+        row["tags"] = [name for name in tags.split(CSV_TAG_SEPARATOR) if name.strip()]
+        yield reader.line_num, row
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv}
+
+
+def check_text(value):
+    """Reject strings PostgreSQL cannot store in a text column."""
+    if not isinstance(value, str):
+        return
+    prohibit_null_characters(value)
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        raise ValidationError("Invalid unicode characters are not allowed.")
+
+
+def clean_row(row):
+    """Validate a row against the model fields, return (cleaned data, errors)."""
+    cleaned = {}
+    errors = {}
+
+    for name in RECIPE_FIELDS:
+        value = row.get(name)
+        if value is None or value == "":
+            if name in REQUIRED_FIELDS:
+                errors[name] = ["This field is required."]
+                continue
+            value = ""
+        try:
+            check_text(value)
+            cleaned[name] = Recipe._meta.get_field(name).clean(value, None)
+        except ValidationError as error:
+            errors[name] = error.messages
+
+    tags = row.get("tags") or []
+    if not isinstance(tags, list):
+        errors["tags"] = ["Expected a list of tags."]
+        return cleaned, errors
+
+    tag_field = Tag._meta.get_field("name")
+    names = []
+    for tag in tags:
+        name = tag.get("name") if isinstance(tag, dict) else tag
+        if not isinstance(name, str):
+            errors["tags"] = ["Tags must be names or objects with a name."]
+            break
+        try:
+            check_text(name)
+            names.append(tag_field.clean(name.strip(), None))
+        except ValidationError as error:
+            errors["tags"] = error.messages
+            break
+    cleaned["tags"] = list(dict.fromkeys(names))
+
+    return cleaned, errors
+
+
+def _array_literal(values):
+    """Return a PostgreSQL text[] literal."""
+    items = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(items) + "}"
+
+
+def _copy(cursor, buffer, lines):
+    """Copy the buffered rows, lines holds the source line number of each of them."""
+    buffer.seek(0)
+    try:
+        # copy_expert() is not wrapped by Django, convert its errors like execute() does.
+        with connection.wrap_database_errors:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} (line, title, description, time_minutes, price, link, "
+                "tags) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+    except (DataError, IntegrityError) as error:
+        diag = error.__cause__.diag
+        # The context names the failing row of the buffer, as "COPY <table>, line <n>".
+        match = COPY_CONTEXT_LINE.search(diag.context or "")
+        line = lines[int(match.group(1)) - 1] if match else None
+        raise ImportFailed(line, diag.message_primary or str(error)) from error
+
+
+def import_recipes(user, rows, batch_size=10000):
+    """Import (line number, row) pairs as recipes of the user and return an ImportResult."""
+    result = ImportResult()
+    started = time.monotonic()
+    recipe_table = Recipe._meta.db_table
+    tag_table = Tag._meta.db_table
+    through_table = Recipe.tags.through._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [recipe_table])
+        sequence = cursor.fetchone()[0]
+        # Recipe ids are allocated while copying so tag links can be built from the
+        # staging table without reading the inserted recipes back.
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                line integer NOT NULL,
+                recipe_id bigint NOT NULL DEFAULT nextval(%s::regclass),
+                title text NOT NULL,
+                description text NOT NULL,
+                time_minutes integer NOT NULL,
+                price numeric(5, 2) NOT NULL,
+                link text NOT NULL,
+                tags text[] NOT NULL
+            ) ON COMMIT DROP
+            """,
+            [sequence],
+        )
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        pending = []
+        for line, row in rows:
+            if row is None:
+                result.add_error(line, {"non_field_errors": ["Expected a JSON object."]})
+                continue
+            cleaned, errors = clean_row(row)
+            if errors:
+                result.add_error(line, errors)
+                continue
+
+            writer.writerow(
+                [line]
+                + [cleaned[name] for name in RECIPE_FIELDS]
+                + [_array_literal(cleaned["tags"])]
+            )
+            pending.append(line)
+            if len(pending) == batch_size:
+                _copy(cursor, buffer, pending)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+                pending = []
+        if pending:
+            _copy(cursor, buffer, pending)
+
+        cursor.execute(
+            f"""
+            INSERT INTO {tag_table} (user_id, name, updated_at)
+            SELECT DISTINCT %s, tag.name, now()
+            FROM {STAGING_TABLE} CROSS JOIN LATERAL unnest(tags) AS tag(name)
+            ON CONFLICT (user_id, name) DO NOTHING
+            """,
+            [user.pk],
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {recipe_table}
+                (id, user_id, title, description, time_minutes, price, link, updated_at)
+            SELECT recipe_id, %s, title, description, time_minutes, price, link, now()
+            FROM {STAGING_TABLE}
+            ORDER BY line
+            """,
+            [user.pk],
+        )
+        result.created = cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {through_table} (recipe_id, tag_id)
+            SELECT DISTINCT staging.recipe_id, tag.id
+            FROM {STAGING_TABLE} staging
+            CROSS JOIN LATERAL unnest(staging.tags) AS names(name)
+            JOIN {tag_table} tag ON tag.user_id = %s AND tag.name = names.name
+            """,
+            [user.pk],
+        )
+        # ON COMMIT DROP only fires at the outermost commit.
+        cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+
+    cache.invalidate(user.pk)
+    similarity.invalidate(user.pk)
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Imported %d recipes for user %s in %.2fs (%.0f rows/s), %d rows rejected",
+        result.created,
+        user.pk,
+        elapsed,
+        result.created / elapsed if elapsed else 0,
+        len(result.errors),
+    )
+
+    return result
@@ -0,0 +1,20 @@
+"""
+    Django command to run the recipe API benchmarks.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run a benchmark against throwaway data that is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(BENCHMARKS))
+        parser.add_argument("--size", type=int, default=1000, help="Number of recipes.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            BENCHMARKS[options["name"]](options["size"], options["repeat"], self.stdout)
+            transaction.set_rollback(True)
@@ -0,0 +1,28 @@
+"""
+    Pagination classes for the recipe APIs.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination for recipes, newest first."""
+
+    ordering = "-id"
+    page_size = settings.RECIPE_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.RECIPE_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        """Use the view's ordering for this request when it sets one, e.g. by rank."""
+        ordering = getattr(view, "pagination_ordering", None)
+        if ordering:
+            return ordering
+
+        return super().get_ordering(request, queryset, view)
+
+
+class NameCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for tags and ingredients, ordered by name."""
+
+    ordering = "-name"
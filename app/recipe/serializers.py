@@ -1,8 +1,37 @@
 """
     Serializers for recipe api.
 """
+from functools import partial
+from itertools import chain
+
 from core.models import Ingredient, Recipe, Tag
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from recipe import cache, images, similarity
 from rest_framework import serializers
+from rest_framework.serializers import as_serializer_error
+
+
+def get_or_create_tags(user, names):
+    """Return the user's tags with the given names, creating the missing ones in bulk."""
+    names = list(dict.fromkeys(names))
+    tags = {tag.name: tag for tag in Tag.objects.filter(user=user, name__in=names)}
+
+    missing = [name for name in names if name not in tags]
+    if missing:
+        # Tags created concurrently by another request are skipped on conflict and
+        # picked up by the second lookup.
+        Tag.objects.bulk_create(
+            [Tag(user=user, name=name) for name in missing], ignore_conflicts=True
+        )
+        created = {tag.name: tag for tag in Tag.objects.filter(user=user, name__in=missing)}
+        tags.update(created)
+        cache.invalidate(user.pk)
+        # Tags of concurrent requests get counted twice, which the state check corrects.
+        transaction.on_commit(partial(similarity.advance_state, user.pk, tags=len(created)))
+
+    return [tags[name] for name in names]
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -22,7 +51,119 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+def validate_bulk_size(items):
+    """Reject bulk requests changing more than RECIPE_BULK_MAX_ITEMS objects."""
+    max_items = settings.RECIPE_BULK_MAX_ITEMS
+    if len(items) > max_items:
+        raise serializers.ValidationError(f"Cannot change more than {max_items} objects at once.")
+
+    return items
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    """Ids of objects deleted or cloned at once."""
+
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, ids):
+        return list(dict.fromkeys(validate_bulk_size(ids)))
+
+
+class CloneSerializer(serializers.Serializer):
+    """Id of a copied recipe and of its copy."""
+
+    source = serializers.IntegerField()
+    id = serializers.IntegerField()
+
+
+class BulkCloneResultSerializer(serializers.Serializer):
+    """Copies made by a bulk clone request."""
+
+    created = serializers.IntegerField()
+    clones = CloneSerializer(many=True)
+
+
+class BulkRenameListSerializer(serializers.ListSerializer):
+    def validate(self, items):
+        validate_bulk_size(items)
+        if len({item["id"] for item in items}) != len(items):
+            raise serializers.ValidationError("Each id can only be renamed once.")
+
+        return items
+
+
+class RenameSerializer(serializers.ModelSerializer):
+    """New name of one object in a bulk rename."""
+
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        fields = ("id", "name")
+        list_serializer_class = BulkRenameListSerializer
+
+
+class TagRenameSerializer(RenameSerializer):
+    class Meta(RenameSerializer.Meta):
+        model = Tag
+
+
+class IngredientRenameSerializer(RenameSerializer):
+    class Meta(RenameSerializer.Meta):
+        model = Ingredient
+
+
+class RecipeRenameSerializer(RenameSerializer):
+    class Meta(RenameSerializer.Meta):
+        model = Recipe
+        fields = ("id", "title")
+
+
+class SparseFieldsMixin:
+    """Only output the fields listed in the "fields" serializer context, when given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get("fields")
+        if requested is not None:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for creating many recipes at once."""
+
+    def to_internal_value(self, data):
+        # Checked before validating the items, which is the costly part of large requests.
+        if isinstance(data, list):
+            try:
+                validate_bulk_size(data)
+            except serializers.ValidationError as error:
+                raise serializers.ValidationError(as_serializer_error(error))
+
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        """Create recipes, their tags and tag links with bulk inserts."""
+        user = self.context["request"].user
+        tag_names = [[tag["name"] for tag in item.pop("tags", [])] for item in validated_data]
+
+        recipes = Recipe.objects.bulk_create([Recipe(**item) for item in validated_data])
+        tags = {tag.name: tag for tag in get_or_create_tags(user, chain.from_iterable(tag_names))}
+
+        through = Recipe.tags.through
+        through.objects.bulk_create(
+            [
+                through(recipe_id=recipe.pk, tag_id=tags[name].pk)
+                for recipe, names in zip(recipes, tag_names)
+                for name in dict.fromkeys(names)
+            ]
+        )
+        prefetch_related_objects(recipes, "tags")
+
+        return recipes
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serialzier for Recipe model"""
 
     tags = TagSerializer(many=True, required=False)
@@ -31,23 +172,20 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = ["id", "title", "time_minutes", "price", "link", "tags"]
         read_only_fields = ("id",)
+        list_serializer_class = RecipeListSerializer
 
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
         recipe = Recipe.objects.create(**validated_data)
         user = self.context["request"].user
 
-        for tag_params in tags:
-            tag, created = Tag.objects.get_or_create(
-                user=user,
-                **tag_params,
-            )
-            recipe.tags.add(tag)
+        if tags:
+            recipe.tags.add(*get_or_create_tags(user, [tag["name"] for tag in tags]))
 
         return recipe
 
 
-class RecipeDetailSerializer(serializers.ModelSerializer):
+class RecipeDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipe detail view"""
 
     tags = TagSerializer(many=True, required=False)
@@ -56,22 +194,16 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = RecipeSerializer.Meta.fields + ["description"]
 
-    def _get_or_create_tags(self, tags, recipe):
-        """Handle getting or creating tags as needed."""
+    def _set_tags(self, tags, recipe):
+        """Link the recipe to exactly the given tags, touching only changed links."""
         user = self.context["request"].user
-        for tag_params in tags:
-            tag, created = Tag.objects.get_or_create(
-                user=user,
-                **tag_params,
-            )
-            recipe.tags.add(tag)
+        recipe.tags.set(get_or_create_tags(user, [tag["name"] for tag in tags]))
 
     def update(self, instance, validated_data):
         """Update recipe."""
         tags = validated_data.pop("tags", None)
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            self._set_tags(tags, instance)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -79,3 +211,27 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
         instance.save()
 
         return instance
+
+
+class RecipeImageSerializer(serializers.ModelSerializer):
+    """Serializer for uploading images to recipes."""
+
+    # Checked from the image header only, decoding is left to the thumbnail workers.
+    image = serializers.FileField()
+    thumbnail = serializers.FileField(read_only=True)
+    image_status = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Recipe
+        fields = ("id", "image", "thumbnail", "image_status")
+        read_only_fields = ("id",)
+
+    def validate_image(self, upload):
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        if upload.size > max_size:
+            raise serializers.ValidationError(f"Images cannot be larger than {max_size} bytes.")
+        if images.image_format(upload) is None:
+            formats = ", ".join(images.FORMATS)
+            raise serializers.ValidationError(f"Upload a valid image ({formats}).")
+
+        return upload
@@ -0,0 +1,83 @@
+"""
+    Signal handlers invalidating the cached tag and ingredient lists, and updating the
+    similar-recipe indexes.
+
+    The cached lists only change with Tag and Ingredient rows. The similarity indexes
+    apply every recipe, tag, ingredient and link write to themselves, so that their
+    periodic state check only rebuilds them for writes made elsewhere. Code writing any
+    of these without signals (bulk inserts, set-based deletes, cloning, imports) calls
+    recipe.cache.invalidate() and recipe.similarity.invalidate() itself.
+"""
+from functools import partial
+
+from core.models import Ingredient, Recipe, Tag
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from recipe import cache, similarity
+
+
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Ingredient)
+def invalidate_cached_lists(sender, instance, **kwargs):
+    """Drop the owner's cached lists whenever one of their tags or ingredients changes."""
+    cache.invalidate(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def refresh_similarity_index(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reload the features of recipes whose tags or ingredients changed, on commit."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        callback = partial(similarity.refresh_recipes, instance.user_id, {instance.pk})
+    elif pk_set is not None:
+        callback = partial(similarity.refresh_recipes, instance.user_id, set(pk_set))
+    else:
+        # Cleared from the tag or ingredient side, the affected recipes are unknown.
+        callback = partial(similarity.forget_user, instance.user_id)
+    transaction.on_commit(callback)
+
+
+@receiver(post_save, sender=Recipe)
+def record_saved_recipe(sender, instance, created, **kwargs):
+    """Add new recipes to the owner's index and advance its state, on commit."""
+    transaction.on_commit(
+        partial(
+            similarity.recipe_saved,
+            instance.user_id,
+            instance.pk,
+            created,
+            instance.updated_at,
+        )
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def record_deleted_recipe(sender, instance, **kwargs):
+    """Remove deleted recipes from the owner's index, on commit."""
+    transaction.on_commit(partial(similarity.recipe_deleted, instance.user_id, instance.pk))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def record_created_feature(sender, instance, created, **kwargs):
+    """Count new tags and ingredients in the owner's index state, on commit."""
+    if created:
+        name = "tags" if sender is Tag else "ingredients"
+        transaction.on_commit(partial(similarity.advance_state, instance.user_id, **{name: 1}))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def record_deleted_feature(sender, instance, **kwargs):
+    """Drop deleted tags and ingredients from the owner's index, on commit."""
+    if sender is Tag:
+        feature, written = similarity.tag_feature(instance.pk), {"tags": -1}
+    else:
+        feature, written = similarity.ingredient_feature(instance.pk), {"ingredients": -1}
+    transaction.on_commit(
+        partial(similarity.feature_deleted, instance.user_id, feature, **written)
+    )
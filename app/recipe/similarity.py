@@ -0,0 +1,277 @@
+"""
+    Similar-recipe lookups from an in-memory inverted index.
+
+    Each user's recipes get an index from tag and ingredient features to the rows of
+    the recipes having them. The recipes most similar to one are found by counting,
+    with numpy.bincount, how many features every other recipe shares with it, which
+    gives the Jaccard similarity |A & B| / |A | B| without touching the database.
+
+    Indexes live in the memory of each process. Writes made through the ORM update
+    them incrementally on commit (see recipe.signals) and advance the state they were
+    built from by what was written. Set-based writes in this project call invalidate(),
+    writes from elsewhere are caught by comparing that state with the database at most
+    every RECIPE_SIMILARITY["CHECK_INTERVAL"] seconds and rebuilding the index when it
+    differs.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+
+import numpy as np
+from core.models import Ingredient, Recipe, Tag
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+EMPTY = np.empty(0, dtype=np.int32)
+
+
+def tag_feature(tag_id):
+    return tag_id * 2
+
+
+def ingredient_feature(ingredient_id):
+    return ingredient_id * 2 + 1
+
+
+def load_features(recipes):
+    """Return {recipe id: set of features} of a queryset of recipes."""
+    features = defaultdict(set)
+    tags = Recipe.tags.through.objects.filter(recipe__in=recipes)
+    for recipe_id, tag_id in tags.values_list("recipe_id", "tag_id").iterator():
+        features[recipe_id].add(tag_feature(tag_id))
+    ingredients = Recipe.ingredients.through.objects.filter(recipe__in=recipes)
+    for recipe_id, ingredient_id in ingredients.values_list(
+        "recipe_id", "ingredient_id"
+    ).iterator():
+        features[recipe_id].add(ingredient_feature(ingredient_id))
+
+    return features
+
+
+State = namedtuple("State", ("recipes", "last_modified", "tags", "ingredients"))
+
+
+def user_state(user_id):
+    """Return a State that changes whenever the user's recipes, tags or ingredients do."""
+    recipes = Recipe.objects.filter(user_id=user_id).aggregate(
+        count=Count("*"), last_modified=Max("updated_at")
+    )
+    tags = Tag.objects.filter(user_id=user_id).count()
+    ingredients = Ingredient.objects.filter(user_id=user_id).count()
+
+    return State(recipes["count"], recipes["last_modified"], tags, ingredients)
+
+
+class SimilarityIndex:
+    """Inverted index of the features of one user's recipes."""
+
+    def __init__(self, features, state):
+        self.lock = threading.Lock()
+        self.state = state
+        self.checked = time.monotonic()
+        self.recipe_ids = np.fromiter(features, dtype=np.int64, count=len(features))
+        self.rows = {recipe_id: row for row, recipe_id in enumerate(features)}
+        self.features = [set(recipe_features) for recipe_features in features.values()]
+        self.sizes = np.fromiter(
+            (len(recipe_features) for recipe_features in self.features),
+            dtype=np.int32,
+            count=len(self.features),
+        )
+
+        postings = defaultdict(list)
+        for row, recipe_features in enumerate(self.features):
+            for feature in recipe_features:
+                postings[feature].append(row)
+        self.postings = {
+            feature: np.asarray(rows, dtype=np.int32) for feature, rows in postings.items()
+        }
+
+    @classmethod
+    def build(cls, user_id):
+        state = user_state(user_id)
+        recipes = Recipe.objects.filter(user_id=user_id)
+        features = {recipe_id: set() for recipe_id in recipes.values_list("id", flat=True)}
+        features.update(load_features(recipes))
+
+        return cls(features, state)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self.rows
+
+    def set_features(self, recipe_id, features):
+        """Replace the features of a recipe, adding the recipe if it is new."""
+        with self.lock:
+            row = self.rows.get(recipe_id)
+            if row is None:
+                row = len(self.features)
+                self.rows[recipe_id] = row
+                self.recipe_ids = np.append(self.recipe_ids, recipe_id)
+                self.sizes = np.append(self.sizes, np.int32(0))
+                self.features.append(set())
+
+            old = self.features[row]
+            for feature in old - features:
+                rows = self.postings[feature]
+                self.postings[feature] = rows[rows != row]
+            for feature in features - old:
+                self.postings[feature] = np.append(self.postings.get(feature, EMPTY), row)
+            self.features[row] = set(features)
+            self.sizes[row] = len(features)
+
+    def remove(self, recipe_id):
+        """Drop a recipe, its row stays allocated but matches nothing."""
+        if recipe_id in self.rows:
+            self.set_features(recipe_id, set())
+            with self.lock:
+                del self.rows[recipe_id]
+
+    def remove_feature(self, feature):
+        """Drop a feature from every recipe having it."""
+        with self.lock:
+            rows = self.postings.pop(feature, EMPTY)
+            for row in rows:
+                self.features[row].discard(feature)
+            self.sizes[rows] -= 1
+
+    def advance(self, recipes=0, last_modified=None, tags=0, ingredients=0):
+        """Account for writes applied to the index in the state it was built from."""
+        with self.lock:
+            state = self.state
+            if last_modified is None or (
+                state.last_modified is not None and state.last_modified > last_modified
+            ):
+                last_modified = state.last_modified
+            self.state = State(
+                state.recipes + recipes,
+                last_modified,
+                state.tags + tags,
+                state.ingredients + ingredients,
+            )
+
+    def similar(self, recipe_id, limit):
+        """Return up to limit (recipe id, similarity) pairs, most similar first."""
+        with self.lock:
+            row = self.rows[recipe_id]
+            features = self.features[row]
+            if not features:
+                return []
+
+            hits = np.concatenate([self.postings[feature] for feature in features])
+            shared = np.bincount(hits, minlength=len(self.sizes))
+            shared[row] = 0
+            candidates = np.flatnonzero(shared)
+            scores = shared[candidates] / (
+                self.sizes[candidates] + len(features) - shared[candidates]
+            )
+            if len(candidates) > limit:
+                # Keep the candidates scoring at least the limit-th best score, ties
+                # included, so that only those need sorting.
+                threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+                best = scores >= threshold
+                candidates, scores = candidates[best], scores[best]
+            recipe_ids = self.recipe_ids[candidates]
+            # Best scores first, newer recipes first among equal scores.
+            order = np.lexsort((-recipe_ids, -scores))[:limit]
+
+            return [(int(recipe_ids[i]), float(scores[i])) for i in order]
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(user_id, rebuild=False):
+    """Return the user's index, rebuilt first if their recipes changed without signals."""
+    options = settings.RECIPE_SIMILARITY
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+        if index is not None:
+            _indexes.move_to_end(user_id)
+    reuse = index is not None and not rebuild
+    if reuse and time.monotonic() - index.checked < options["CHECK_INTERVAL"]:
+        return index
+
+    if not reuse or index.state != user_state(user_id):
+        index = SimilarityIndex.build(user_id)
+    index.checked = time.monotonic()
+    with _indexes_lock:
+        _indexes[user_id] = index
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > options["MAX_USERS"]:
+            _indexes.popitem(last=False)
+
+    return index
+
+
+def _loaded_index(user_id):
+    with _indexes_lock:
+        return _indexes.get(user_id)
+
+
+def refresh_recipes(user_id, recipe_ids):
+    """Reload the features of recipes in the user's index, if the index is loaded."""
+    index = _loaded_index(user_id)
+    if index is None:
+        return
+
+    existing = Recipe.objects.filter(user_id=user_id, id__in=recipe_ids)
+    features = {recipe_id: set() for recipe_id in existing.values_list("id", flat=True)}
+    features.update(load_features(existing))
+    for recipe_id in recipe_ids:
+        if recipe_id in features:
+            index.set_features(recipe_id, features[recipe_id])
+        else:
+            index.remove(recipe_id)
+
+
+def recipe_saved(user_id, recipe_id, created, updated_at):
+    """Record a recipe saved through the ORM in the user's index, if it is loaded."""
+    index = _loaded_index(user_id)
+    if index is None:
+        return
+
+    if created and recipe_id not in index:
+        # Links are only added after the recipe row, by their own signals.
+        index.set_features(recipe_id, set())
+    index.advance(recipes=int(created), last_modified=updated_at)
+
+
+def recipe_deleted(user_id, recipe_id):
+    """Record a recipe deleted through the ORM in the user's index, if it is loaded."""
+    index = _loaded_index(user_id)
+    if index is None:
+        return
+
+    index.remove(recipe_id)
+    # The latest updated_at may have gone with the recipe, which only the next state
+    # check can tell. It then rebuilds the index.
+    index.advance(recipes=-1)
+
+
+def feature_deleted(user_id, feature, tags=0, ingredients=0):
+    """Record a tag or ingredient deleted through the ORM in the user's index."""
+    index = _loaded_index(user_id)
+    if index is None:
+        return
+
+    index.remove_feature(feature)
+    index.advance(tags=tags, ingredients=ingredients)
+
+
+def advance_state(user_id, **written):
+    """Record rows written without changing any recipe's features, see advance()."""
+    index = _loaded_index(user_id)
+    if index is not None:
+        index.advance(**written)
+
+
+def forget_user(user_id):
+    with _indexes_lock:
+        _indexes.pop(user_id, None)
+
+
+def invalidate(user_id):
+    """Drop the user's index after writes that send no signals, now and on commit."""
+    forget_user(user_id)
+    transaction.on_commit(lambda: forget_user(user_id))
@@ -0,0 +1,4 @@
+"""
+    Tasks of the recipe app, imported by "manage.py run_worker" to register them.
+"""
+from recipe.images import generate_thumbnail  # noqa: F401
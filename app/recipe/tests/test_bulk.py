@@ -0,0 +1,138 @@
+"""
+    Tests for the bulk delete and rename actions.
+"""
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import cache
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+def create_recipe(user, title="Sample recipe"):
+    return Recipe.objects.create(user=user, title=title, time_minutes=10, price=Decimal("1.00"))
+
+
+class BulkChangeApiTests(TestCase):
+    """Test the bulk actions of the tag, ingredient and recipe APIs."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.other = get_user_model().objects.create_user("other@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_delete_tags(self):
+        """Test deleting tags removes them from recipes and counts deleted rows."""
+        tags = [Tag.objects.create(user=self.user, name=f"Tag {i}") for i in range(3)]
+        recipe = create_recipe(self.user)
+        recipe.tags.add(tags[0], tags[2])
+        other_tag = Tag.objects.create(user=self.other, name="Other")
+
+        payload = {"ids": [tags[0].id, tags[1].id, tags[1].id, other_tag.id, 99999]}
+        response = self.client.post(reverse("recipe:tag-bulk-delete"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 2})
+        self.assertEqual(list(Tag.objects.filter(user=self.user)), [tags[2]])
+        self.assertEqual(list(recipe.tags.all()), [tags[2]])
+        self.assertTrue(Tag.objects.filter(pk=other_tag.pk).exists())
+
+    def test_bulk_delete_invalidates_cached_lists(self):
+        """Test bulk deletes invalidate the user's cached lists."""
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        version = cache.get_version(self.user.pk)
+
+        url = reverse("recipe:ingredient-bulk-delete")
+        response = self.client.post(url, {"ids": [ingredient.id]}, format="json")
+
+        self.assertEqual(response.data, {"deleted": 1})
+        self.assertNotEqual(cache.get_version(self.user.pk), version)
+
+    def test_bulk_delete_recipes(self):
+        """Test deleting recipes keeps their tags and ingredients."""
+        recipes = [create_recipe(self.user, f"Recipe {i}") for i in range(3)]
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        recipes[0].tags.add(tag)
+
+        payload = {"ids": [recipe.id for recipe in recipes[:2]]}
+        response = self.client.post(reverse("recipe:recipe-bulk-delete"), payload, format="json")
+
+        self.assertEqual(response.data, {"deleted": 2})
+        self.assertEqual(list(Recipe.objects.all()), [recipes[2]])
+        self.assertFalse(Recipe.tags.through.objects.exists())
+        self.assertTrue(Tag.objects.filter(pk=tag.pk).exists())
+
+    def test_bulk_delete_requires_ids(self):
+        """Test bulk delete rejects an empty or invalid id list."""
+        url = reverse("recipe:tag-bulk-delete")
+
+        for payload in ({}, {"ids": []}, {"ids": ["abc"]}):
+            with self.subTest(payload=payload):
+                response = self.client.post(url, payload, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_delete_limited(self):
+        """Test bulk delete rejects more ids than allowed."""
+        url = reverse("recipe:tag-bulk-delete")
+        response = self.client.post(url, {"ids": [1, 2, 3]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_rename_tags(self):
+        """Test renaming tags in one update, ignoring other users' tags."""
+        breakfast = Tag.objects.create(user=self.user, name="Breakfast")
+        dinner = Tag.objects.create(user=self.user, name="Dinner")
+        other_tag = Tag.objects.create(user=self.other, name="Other")
+
+        payload = [
+            {"id": breakfast.id, "name": "Brunch"},
+            {"id": dinner.id, "name": "Supper"},
+            {"id": other_tag.id, "name": "Mine"},
+        ]
+        response = self.client.post(reverse("recipe:tag-bulk-rename"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(
+            set(Tag.objects.filter(user=self.user).values_list("name", flat=True)),
+            {"Brunch", "Supper"},
+        )
+        other_tag.refresh_from_db()
+        self.assertEqual(other_tag.name, "Other")
+
+    def test_bulk_rename_tag_duplicate_name(self):
+        """Test renaming a tag to an existing name changes nothing."""
+        breakfast = Tag.objects.create(user=self.user, name="Breakfast")
+        dinner = Tag.objects.create(user=self.user, name="Dinner")
+
+        payload = [{"id": breakfast.id, "name": "Brunch"}, {"id": dinner.id, "name": "Brunch"}]
+        response = self.client.post(reverse("recipe:tag-bulk-rename"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(Tag.objects.values_list("name", flat=True)), {"Breakfast", "Dinner"})
+
+    def test_bulk_rename_duplicate_ids(self):
+        """Test an id can only be renamed once per request."""
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+
+        payload = [{"id": ingredient.id, "name": "Pepper"}, {"id": ingredient.id, "name": "Oil"}]
+        url = reverse("recipe:ingredient-bulk-rename")
+        response = self.client.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_rename_recipes(self):
+        """Test renaming recipes sets their titles."""
+        recipe = create_recipe(self.user)
+
+        payload = [{"id": recipe.id, "title": "Renamed"}]
+        response = self.client.post(reverse("recipe:recipe-bulk-rename"), payload, format="json")
+
+        self.assertEqual(response.data, {"updated": 1})
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Renamed")
@@ -0,0 +1,108 @@
+"""
+    Tests for cloning recipes.
+"""
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from recipe.cloning import clone_recipes
+from recipe.tests.test_recipe_api import count_queries
+from rest_framework import status
+from rest_framework.test import APIClient
+
+BULK_CLONE_URL = reverse("recipe:recipe-bulk-clone")
+
+
+def clone_url(recipe_id):
+    return reverse("recipe:recipe-clone", args=[recipe_id])
+
+
+def create_recipe(user, title="Sample recipe", tag_count=0):
+    recipe = Recipe.objects.create(
+        user=user,
+        title=title,
+        description="Sample description",
+        time_minutes=22,
+        price=Decimal("5.25"),
+        link="https://example.com/recipe",
+    )
+    for i in range(tag_count):
+        recipe.tags.add(Tag.objects.get_or_create(user=user, name=f"Tag {i}")[0])
+
+    return recipe
+
+
+class CloneRecipeApiTests(TestCase):
+    """Tests for the clone actions."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_clone_recipe(self):
+        """Test cloning copies the fields and the tag and ingredient links."""
+        recipe = create_recipe(self.user, tag_count=2)
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        recipe.ingredients.add(ingredient)
+
+        response = self.client.post(clone_url(recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        clone = Recipe.objects.get(pk=response.data["id"])
+        self.assertNotEqual(clone.pk, recipe.pk)
+        for field in ("user", "title", "description", "time_minutes", "price", "link"):
+            self.assertEqual(getattr(clone, field), getattr(recipe, field))
+        self.assertEqual(set(clone.tags.all()), set(recipe.tags.all()))
+        self.assertEqual(list(clone.ingredients.all()), [ingredient])
+        self.assertEqual(len(response.data["tags"]), 2)
+        self.assertTrue(Recipe.objects.filter(pk=clone.pk, search_vector__isnull=False).exists())
+
+    def test_clone_other_users_recipe(self):
+        """Test other users' recipes cannot be cloned."""
+        other = get_user_model().objects.create_user("other@example.com", "testpass123")
+        recipe = create_recipe(other)
+
+        response = self.client.post(clone_url(recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_clone_query_count_constant(self):
+        """Test the number of queries does not depend on the number of tags."""
+        few = create_recipe(self.user, tag_count=1)
+        many = create_recipe(self.user, tag_count=10)
+
+        self.assertEqual(
+            count_queries(clone_recipes, self.user, [few.id]),
+            count_queries(clone_recipes, self.user, [many.id]),
+        )
+        self.assertEqual(count_queries(clone_recipes, self.user, [few.id, many.id]), 1)
+
+    def test_bulk_clone(self):
+        """Test cloning many recipes keeps the request order and skips foreign ids."""
+        first = create_recipe(self.user, "First", tag_count=1)
+        second = create_recipe(self.user, "Second", tag_count=3)
+        other = get_user_model().objects.create_user("other@example.com", "testpass123")
+        foreign = create_recipe(other)
+
+        payload = {"ids": [second.id, foreign.id, first.id]}
+        response = self.client.post(BULK_CLONE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        sources = [clone["source"] for clone in response.data["clones"]]
+        self.assertEqual(sources, [second.id, first.id])
+        for clone in response.data["clones"]:
+            source = Recipe.objects.get(pk=clone["source"])
+            copy = Recipe.objects.get(pk=clone["id"])
+            self.assertEqual(copy.title, source.title)
+            self.assertEqual(copy.tags.count(), source.tags.count())
+        self.assertEqual(Recipe.objects.filter(user=other).count(), 1)
+
+    def test_bulk_clone_requires_ids(self):
+        response = self.client.post(BULK_CLONE_URL, {"ids": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,66 @@
+"""
+    Tests for the values() based list serialization.
+"""
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+from recipe.fastpath import list_values, represent_rows
+from recipe.serializers import IngredientSerializer, RecipeSerializer, TagSerializer
+from rest_framework.renderers import JSONRenderer
+
+
+class FastPathTests(TestCase):
+    """Test the fast path renders the same bytes as the serializers."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.renderer = JSONRenderer()
+        tags = [Tag.objects.create(user=self.user, name=f"Tag {i}") for i in range(3)]
+        for i in range(4):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f"Recipe é {i}",
+                time_minutes=i,
+                price=Decimal("1.5") * i,
+                link="" if i % 2 else "https://example.com",
+            )
+            recipe.tags.add(*tags[: i % 4])
+
+    def assertSameJson(self, serializer_class, queryset):
+        serializer = serializer_class()
+        fast = represent_rows(serializer, list_values(queryset, serializer))
+        standard = serializer_class(queryset, many=True).data
+
+        self.assertEqual(self.renderer.render(fast), self.renderer.render(standard))
+
+    def test_recipes_identical(self):
+        queryset = (
+            Recipe.objects.filter(user=self.user)
+            .prefetch_related(Prefetch("tags", queryset=Tag.objects.order_by("id")))
+            .order_by("-id")
+        )
+
+        self.assertSameJson(RecipeSerializer, queryset)
+
+    def test_tags_identical(self):
+        self.assertSameJson(TagSerializer, Tag.objects.filter(user=self.user).order_by("-name"))
+
+    def test_ingredients_identical(self):
+        Ingredient.objects.create(user=self.user, name="Salt")
+        Ingredient.objects.create(user=self.user, name="Pepper")
+
+        self.assertSameJson(
+            IngredientSerializer, Ingredient.objects.filter(user=self.user).order_by("-name")
+        )
+
+    def test_sparse_fields_identical(self):
+        queryset = Recipe.objects.filter(user=self.user).order_by("-id")
+        context = {"fields": ["price", "title"]}
+        serializer = RecipeSerializer(context=context)
+        fast = represent_rows(serializer, list_values(queryset, serializer))
+        standard = RecipeSerializer(queryset, many=True, context=context).data
+
+        self.assertEqual(self.renderer.render(fast), self.renderer.render(standard))
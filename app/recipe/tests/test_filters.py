@@ -0,0 +1,115 @@
+"""
+    Tests for filtering the recipe list.
+"""
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from core.tests.utils import used_indexes
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.filters import filter_recipes
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def create_recipe(user, **params):
+    defaults = {"title": "Recipe", "time_minutes": 10, "price": Decimal("5.00")}
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeFilterTests(TestCase):
+    """Test the recipe list query parameter filters."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.quick = Tag.objects.create(user=self.user, name="Quick")
+        self.salt = Ingredient.objects.create(user=self.user, name="Salt")
+        self.flour = Ingredient.objects.create(user=self.user, name="Flour")
+
+        self.salad = create_recipe(self.user, title="Salad", price=Decimal("3.00"), time_minutes=5)
+        self.salad.tags.add(self.vegan, self.quick)
+        self.salad.ingredients.add(self.salt)
+        self.bread = create_recipe(
+            self.user, title="Bread", price=Decimal("2.00"), time_minutes=90
+        )
+        self.bread.tags.add(self.vegan)
+        self.bread.ingredients.add(self.salt, self.flour)
+        self.steak = create_recipe(self.user, title="Steak", price=Decimal("20.00"))
+        self.steak.tags.add(self.quick)
+
+    def _ids(self, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(RECIPES_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Conditional GET state, the recipe page and the tag prefetch, whatever the filter.
+        self.assertEqual(len(context.captured_queries), 4)
+
+        return {recipe["id"] for recipe in response.data["results"]}
+
+    def _indexes(self, params):
+        queryset = filter_recipes(Recipe.objects.filter(user=self.user), QueryDict(params))
+
+        return used_indexes(queryset)
+
+    def test_filter_any_tags(self):
+        ids = self._ids({"tags": f"{self.vegan.pk},{self.quick.pk}"})
+
+        self.assertEqual(ids, {self.salad.pk, self.bread.pk, self.steak.pk})
+        indexes = self._indexes(f"tags={self.vegan.pk}")
+        self.assertTrue(any(name.startswith("core_recipe_tags") for name in indexes))
+
+    def test_filter_all_tags(self):
+        ids = self._ids({"tags_all": f"{self.vegan.pk},{self.quick.pk}"})
+
+        self.assertEqual(ids, {self.salad.pk})
+        indexes = self._indexes(f"tags_all={self.vegan.pk},{self.quick.pk}")
+        self.assertTrue(any(name.startswith("core_recipe_tags") for name in indexes))
+
+    def test_filter_any_ingredients(self):
+        ids = self._ids({"ingredients": f"{self.salt.pk},{self.flour.pk}"})
+
+        self.assertEqual(ids, {self.salad.pk, self.bread.pk})
+        indexes = self._indexes(f"ingredients={self.salt.pk}")
+        self.assertTrue(any(name.startswith("core_recipe_ingredients") for name in indexes))
+
+    def test_filter_all_ingredients(self):
+        ids = self._ids({"ingredients_all": f"{self.salt.pk},{self.flour.pk}"})
+
+        self.assertEqual(ids, {self.bread.pk})
+        indexes = self._indexes(f"ingredients_all={self.salt.pk},{self.flour.pk}")
+        self.assertTrue(any(name.startswith("core_recipe_ingredients") for name in indexes))
+
+    def test_filter_price_range(self):
+        ids = self._ids({"price_min": "2.50", "price_max": "10"})
+
+        self.assertEqual(ids, {self.salad.pk})
+        self.assertIn("recipe_user_price_idx", self._indexes("price_min=2.50&price_max=10"))
+
+    def test_filter_time_range(self):
+        ids = self._ids({"time_min": "10", "time_max": "60"})
+
+        self.assertEqual(ids, {self.steak.pk})
+        self.assertIn("recipe_user_time_idx", self._indexes("time_min=10&time_max=60"))
+
+    def test_combined_filters(self):
+        ids = self._ids({"tags": str(self.quick.pk), "price_max": "10"})
+
+        self.assertEqual(ids, {self.salad.pk})
+
+    def test_invalid_filter_value(self):
+        for params in ({"tags": "a,b"}, {"price_min": "cheap"}, {"time_max": "1.5"}):
+            response = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,178 @@
+"""
+    Tests for the recipe image upload.
+"""
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Recipe, Task
+from core.tasks import run_tasks
+from django.contrib.auth import get_user_model
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from recipe.thumbnails import make_thumbnail
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+def image_url(recipe_id):
+    return reverse("recipe:recipe-image", args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    defaults = {"title": "Sample recipe", "time_minutes": 10, "price": Decimal("1.00")}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def image_file(size=(600, 400), color="red", suffix=".jpg", file_format="JPEG"):
+    """Return an open temporary image file."""
+    file = tempfile.NamedTemporaryFile(suffix=suffix)
+    Image.new("RGB", size, color).save(file, format=file_format)
+    file.seek(0)
+
+    return file
+
+
+class RecipeImageUploadTests(TestCase):
+    """Tests for uploading recipe images."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, RECIPE_THUMBNAIL_WORKERS=0)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+
+    def upload(self, recipe, file):
+        return self.client.post(image_url(recipe.id), {"image": file}, format="multipart")
+
+    def test_upload_image_pending(self):
+        """Test uploading returns right away with a pending thumbnail."""
+        with image_file() as file:
+            response = self.upload(self.recipe, file)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["image_status"], "pending")
+        self.assertIsNone(response.data["thumbnail"])
+        self.recipe.refresh_from_db()
+        self.assertRegex(self.recipe.image.name, r"^recipes/[0-9a-f]{64}\.jpg$")
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+        task = Task.objects.get()
+        self.assertEqual(task.name, "recipe.images.generate_thumbnail")
+        self.assertEqual(
+            task.kwargs, {"recipe_id": self.recipe.id, "image_name": self.recipe.image.name}
+        )
+
+    def test_thumbnail_generated_by_task_queue(self):
+        """Test the thumbnail is generated by the queued task."""
+        with image_file(size=(1200, 600)) as file:
+            self.upload(self.recipe, file)
+        self.assertEqual(run_tasks(), 1)
+
+        response = self.client.get(image_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["image_status"], "ready")
+        self.recipe.refresh_from_db()
+        with Image.open(self.recipe.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (256, 128))
+
+    def test_same_image_reuses_files(self):
+        """Test uploading an image twice stores it once and reuses its thumbnail."""
+        other = create_recipe(self.user, title="Other recipe")
+        with image_file() as file:
+            self.upload(self.recipe, file)
+        run_tasks()
+        with image_file() as file:
+            response = self.upload(other, file)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["image_status"], "ready")
+        self.recipe.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.recipe.image.name, other.image.name)
+        self.assertEqual(self.recipe.thumbnail.name, other.thumbnail.name)
+
+    def test_upload_png(self):
+        """Test PNG images keep their format and extension."""
+        with image_file(suffix=".png", file_format="PNG") as file:
+            self.upload(self.recipe, file)
+
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image.name.endswith(".png"))
+
+    def test_upload_invalid_image(self):
+        """Test uploading a file that is not an image."""
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as file:
+            file.write(b"not an image")
+            file.seek(0)
+            response = self.upload(self.recipe, file)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_upload_too_large(self):
+        """Test images over the size limit are rejected."""
+        with image_file() as file:
+            response = self.upload(self.recipe, file)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("larger than 100 bytes", response.data["image"][0])
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_upload_too_large_not_written(self):
+        """Test oversized uploads are abandoned before reaching the temporary file."""
+        with image_file() as file, patch.object(
+            TemporaryFileUploadHandler, "receive_data_chunk"
+        ) as receive_data_chunk:
+            response = self.upload(self.recipe, file)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        receive_data_chunk.assert_not_called()
+
+    def test_upload_other_users_recipe(self):
+        """Test images cannot be uploaded to other users' recipes."""
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")
+        recipe = create_recipe(other_user)
+
+        with image_file() as file:
+            response = self.upload(recipe, file)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_image_status_without_image(self):
+        """Test the status of a recipe without image."""
+        response = self.client.get(image_url(self.recipe.id))
+
+        self.assertIsNone(response.data["image"])
+        self.assertIsNone(response.data["image_status"])
+
+
+class MakeThumbnailTests(TestCase):
+    """Tests for rendering thumbnails."""
+
+    def test_make_thumbnail(self):
+        """Test thumbnails keep the aspect ratio and are written as JPEG."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "source.png")
+            target = os.path.join(directory, "thumbnails", "target.jpg")
+            Image.new("RGBA", (300, 900), "blue").save(source)
+
+            make_thumbnail(source, target, 90)
+
+            with Image.open(target) as thumbnail:
+                self.assertEqual(thumbnail.format, "JPEG")
+                self.assertEqual(thumbnail.size, (30, 90))
+            self.assertEqual(os.listdir(os.path.dirname(target)), ["target.jpg"])
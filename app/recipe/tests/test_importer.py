@@ -0,0 +1,142 @@
+"""
+    Tests for the COPY based recipe import.
+"""
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from recipe import importer
+from rest_framework import status
+from rest_framework.test import APIClient
+
+IMPORT_URL = reverse("recipe:recipe-import-recipes")
+
+
+def ndjson(*rows):
+    return [json.dumps(row) + "\n" for row in rows]
+
+
+class ImporterTests(TestCase):
+    """Test importing recipes from NDJSON and CSV."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+
+    def test_import_ndjson(self):
+        """Test valid rows create recipes, tags and links."""
+        Tag.objects.create(user=self.user, name="Vegan")
+        lines = ndjson(
+            {"title": "Soup", "time_minutes": 20, "price": "4.50", "tags": ["Vegan", "Hot"]},
+            {"title": "Cake", "time_minutes": 60, "price": "9.99", "tags": [{"name": "Sweet"}]},
+            {"title": "Toast", "time_minutes": 2, "price": "0.50", "description": "Crispy"},
+        )
+
+        result = importer.import_recipes(self.user, importer.read_ndjson(lines))
+
+        self.assertEqual(result.as_dict(), {"created": 3, "errors": []})
+        soup = Recipe.objects.get(user=self.user, title="Soup")
+        self.assertEqual(soup.price, Decimal("4.50"))
+        self.assertEqual(set(soup.tags.values_list("name", flat=True)), {"Vegan", "Hot"})
+        self.assertEqual(Recipe.objects.get(title="Toast").description, "Crispy")
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 3)
+
+    def test_invalid_rows_reported_and_skipped(self):
+        """Test invalid rows are reported by line without aborting the batch."""
+        lines = (
+            ndjson(
+                {"title": "Soup", "time_minutes": 20, "price": "4.50"},
+                {"title": "", "time_minutes": "soon", "price": "4.50"},
+            )
+            + ["not json\n"]
+            + ndjson({"title": "Cake", "time_minutes": 5, "price": "123456"})
+        )
+
+        result = importer.import_recipes(self.user, importer.read_ndjson(lines))
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error["line"] for error in result.errors], [2, 3, 4])
+        self.assertEqual(set(result.errors[0]["errors"]), {"title", "time_minutes"})
+        self.assertIn("price", result.errors[2]["errors"])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+
+    def test_import_csv(self):
+        """Test CSV rows with "|" separated tags are imported."""
+        lines = [
+            "title,time_minutes,price,link,tags\n",
+            'Pasta,15,6.00,,"Italian|Quick"\n',
+            'Salad,5,3.25,http://example.com,"Quick"\n',
+        ]
+
+        result = importer.import_recipes(self.user, importer.read_csv(lines), batch_size=1)
+
+        self.assertEqual(result.created, 2)
+        pasta = Recipe.objects.get(user=self.user, title="Pasta")
+        self.assertEqual(pasta.link, "")
+        self.assertEqual(set(pasta.tags.values_list("name", flat=True)), {"Italian", "Quick"})
+
+    def test_tag_names_escaped(self):
+        """Test tag names with quotes, commas and backslashes survive the copy."""
+        names = ['Say "hi"', "a,b", "back\\slash", "{braces}"]
+        lines = ndjson({"title": "Soup", "time_minutes": 1, "price": "1.00", "tags": names})
+
+        importer.import_recipes(self.user, importer.read_ndjson(lines))
+
+        self.assertEqual(set(Tag.objects.values_list("name", flat=True)), set(names))
+
+    def test_values_database_refuses_reported(self):
+        """Test values PostgreSQL cannot store are row errors, the other rows are imported."""
+        rows = [{"title": f"Soup {i}", "time_minutes": 1, "price": "1.00"} for i in range(4)]
+        rows[1]["title"] = "Soup\u0000"
+        rows[2]["tags"] = ["Hot\ud800"]
+
+        result = importer.import_recipes(
+            self.user, importer.read_ndjson(ndjson(*rows)), batch_size=2
+        )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error["line"] for error in result.errors], [2, 3])
+        self.assertEqual(set(result.errors[0]["errors"]), {"title"})
+        self.assertEqual(set(result.errors[1]["errors"]), {"tags"})
+        self.assertEqual(set(Recipe.objects.values_list("title", flat=True)), {"Soup 0", "Soup 3"})
+
+
+class ImportApiTests(TestCase):
+    """Test the import endpoint."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_import_upload(self):
+        """Test uploading an NDJSON file imports its recipes."""
+        content = "".join(ndjson({"title": "Soup", "time_minutes": 20, "price": "4.50"}))
+        upload = SimpleUploadedFile("recipes.ndjson", content.encode())
+
+        response = self.client.post(IMPORT_URL, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"created": 1, "errors": []})
+        self.assertTrue(Recipe.objects.filter(user=self.user, title="Soup").exists())
+
+    def test_import_failed(self):
+        """Test a copy refused by the database is a client error naming the line."""
+        upload = SimpleUploadedFile("recipes.ndjson", b"{}\n")
+
+        with patch.object(
+            importer, "import_recipes", side_effect=importer.ImportFailed(3, "Refused.")
+        ):
+            response = self.client.post(IMPORT_URL, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["file"], ["Line 3: Refused."])
+
+    def test_import_requires_file(self):
+        response = self.client.post(IMPORT_URL, {}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,119 @@
+"""
+    Tests for the cached tag and ingredient lists.
+"""
+from decimal import Decimal
+
+from core.models import Ingredient, Tag
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import cache
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TAGS_URL = reverse("recipe:tag-list")
+INGREDIENTS_URL = reverse("recipe:ingredient-list")
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class ListCacheTests(TestCase):
+    """Test caching of rendered list responses."""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        cache.stats.reset()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Tag.objects.create(user=self.user, name="Vegan")
+
+    def test_second_request_served_from_cache(self):
+        """Test repeated list requests hit the cache with identical bytes."""
+        first = self.client.get(TAGS_URL)
+        second = self.client.get(TAGS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+        self.assertEqual(cache.stats.as_dict(), {"hits": 1, "misses": 1})
+
+    @override_settings(
+        RECIPE_LIST_CACHE={**settings.RECIPE_LIST_CACHE, "TIMEOUT": 300, "LOCAL_TIMEOUT": 5}
+    )
+    def test_process_local_cache_expires_sooner(self):
+        """Test entries of a cache other processes cannot invalidate expire quickly."""
+        self.assertEqual(cache.get_timeout(), 5)
+
+    @override_settings(RECIPE_LIST_CACHE={**settings.RECIPE_LIST_CACHE, "STATS_INTERVAL": 0})
+    def test_stats_logged(self):
+        cache.stats.reset()
+
+        with self.assertLogs("recipe.cache", "INFO") as logs:
+            self.client.get(TAGS_URL)
+
+        self.assertIn("0 hits, 1 misses", logs.output[0])
+
+    def test_cache_keyed_by_accepted_media_type(self):
+        """Test renderings for different Accept parameters are cached separately."""
+        compact = self.client.get(TAGS_URL, HTTP_ACCEPT="application/json")
+        indented = self.client.get(TAGS_URL, HTTP_ACCEPT="application/json; indent=4")
+
+        self.assertNotEqual(indented.content, compact.content)
+        self.assertIn(b"\n", indented.content)
+
+    def test_cache_keyed_by_user(self):
+        """Test users never see each other's cached lists."""
+        other = get_user_model().objects.create_user("other@example.com", "testpass123")
+        Tag.objects.create(user=other, name="Fruit")
+        self.client.get(TAGS_URL)
+
+        self.client.force_authenticate(other)
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual([tag["name"] for tag in response.json()["results"]], ["Fruit"])
+
+    def test_tag_save_invalidates(self):
+        """Test creating a tag invalidates the cached list."""
+        self.client.get(TAGS_URL)
+        Tag.objects.create(user=self.user, name="Dessert")
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(cache.stats.as_dict(), {"hits": 0, "misses": 2})
+
+    def test_tag_delete_invalidates(self):
+        """Test deleting a tag invalidates the cached list."""
+        self.client.get(TAGS_URL)
+        Tag.objects.filter(user=self.user).get().delete()
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.json()["results"], [])
+
+    def test_tags_created_with_recipe_invalidate(self):
+        """Test tags bulk created through a recipe invalidate the cached list."""
+        self.client.get(TAGS_URL)
+        payload = {
+            "title": "Recipe",
+            "time_minutes": 5,
+            "price": Decimal("1.00"),
+            "tags": [{"name": "Quick"}],
+        }
+        self.client.post(RECIPES_URL, payload, format="json")
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_ingredient_save_invalidates(self):
+        """Test renaming an ingredient invalidates the cached list."""
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        self.client.get(INGREDIENTS_URL)
+        ingredient.name = "Pepper"
+        ingredient.save()
+
+        response = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(response.json()["results"][0]["name"], "Pepper")
@@ -1,17 +1,26 @@
 """
     Tests for recipe api.
 """
+import json
 from decimal import Decimal
+from unittest.mock import patch
 
 from core.models import Recipe, Tag
+from core.tests.utils import used_indexes
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from recipe.pagination import RecipeCursorPagination
 from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
 
 RECIPES_URL = reverse("recipe:recipe-list")
+BULK_RECIPES_URL = reverse("recipe:recipe-bulk-create")
+EXPORT_RECIPES_URL = reverse("recipe:recipe-export")
 
 
 def detail_url(recipe_id):
@@ -39,6 +48,14 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+def count_queries(func, *args, **kwargs):
+    """Call func and return the number of executed queries."""
+    with CaptureQueriesContext(connection) as context:
+        func(*args, **kwargs)
+
+    return len(context.captured_queries)
+
+
 class PublicRecipeApiTests(TestCase):
     """Test unauthenticated API requests."""
 
@@ -77,7 +94,7 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test get recipes assigned to the user."""
@@ -92,7 +109,39 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_recipe_list_paginated(self):
+        """Test recipes are returned in pages linked by cursors."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+
+        response = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe["id"] for recipe in response.data["results"]],
+            [recipes[2].pk, recipes[1].pk],
+        )
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([recipe["id"] for recipe in response.data["results"]], [recipes[0].pk])
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+
+    def test_recipe_page_size_capped(self):
+        """Test the requested page size cannot exceed the maximum."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+
+        with patch.object(RecipeCursorPagination, "max_page_size", 2):
+            response = self.client.get(RECIPES_URL, {"page_size": 100})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
 
     def test_recipe_detail(self):
         recipe = create_recipe(user=self.user)
@@ -249,6 +298,22 @@ class PrivateRecipeApiTests(TestCase):
             exists = recipe.tags.filter(name=tag["name"], user=self.user)
             self.assertTrue(exists)
 
+    def test_create_recipe_with_duplicate_tags(self):
+        """Test repeated tag names in the payload are linked once."""
+        payload = {
+            "title": "Title 1",
+            "time_minutes": 30,
+            "price": Decimal("3.50"),
+            "tags": [{"name": "Tag 1"}, {"name": "Tag 1"}],
+        }
+
+        response = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(pk=response.data["id"])
+        self.assertEqual(recipe.tags.count(), 1)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
     def test_update_recipe_tags(self):
         """Test updating tags of a recipe."""
         tag1 = Tag.objects.create(user=self.user, name="Tag 1")
@@ -265,3 +330,431 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(recipe.tags.all()), 2)
         self.assertEqual(Tag.objects.count(), 3)
+
+    def test_update_recipe_tags_keeps_unchanged_links(self):
+        """Test updating tags only replaces the links that changed."""
+        tag1 = Tag.objects.create(user=self.user, name="Tag 1")
+        tag2 = Tag.objects.create(user=self.user, name="Tag 2")
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag1, tag2)
+        through = Recipe.tags.through
+        kept_link = through.objects.get(recipe=recipe, tag=tag1)
+
+        payload = {"tags": [{"name": "Tag 1"}, {"name": "Tag 3"}]}
+        response = self.client.patch(detail_url(recipe.pk), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(through.objects.filter(pk=kept_link.pk).exists())
+        self.assertEqual(
+            set(recipe.tags.values_list("name", flat=True)),
+            {"Tag 1", "Tag 3"},
+        )
+
+    def test_update_recipe_same_tags_writes_nothing(self):
+        """Test sending the current tags does not rewrite the links."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Tag 1"))
+        table = Recipe.tags.through._meta.db_table
+
+        payload = {"tags": [{"name": "Tag 1"}]}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(detail_url(recipe.pk), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        writes = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(("INSERT", "DELETE")) and table in query["sql"]
+        ]
+        self.assertEqual(writes, [])
+
+    def test_bulk_create_recipes(self):
+        """Test creating many recipes with shared tags in one request."""
+        Tag.objects.create(user=self.user, name="Vegan")
+        payload = [
+            {
+                "title": "Recipe 1",
+                "time_minutes": 10,
+                "price": "1.50",
+                "tags": [{"name": "Vegan"}, {"name": "Quick"}],
+            },
+            {
+                "title": "Recipe 2",
+                "time_minutes": 20,
+                "price": "2.50",
+                "tags": [{"name": "Quick"}],
+            },
+            {"title": "Recipe 3", "time_minutes": 30, "price": "3.50"},
+        ]
+
+        response = self.client.post(BULK_RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["title"] for item in response.data],
+            ["Recipe 1", "Recipe 2", "Recipe 3"],
+        )
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        recipe = Recipe.objects.get(pk=response.data[0]["id"])
+        self.assertEqual(set(recipe.tags.values_list("name", flat=True)), {"Vegan", "Quick"})
+        self.assertEqual(recipe.user, self.user)
+
+    def test_bulk_create_invalid_item_creates_nothing(self):
+        """Test an invalid item rejects the batch with per-item errors."""
+        payload = [
+            {"title": "Recipe 1", "time_minutes": 10, "price": "1.50"},
+            {"title": "Recipe 2", "time_minutes": "soon", "price": "2.50"},
+        ]
+
+        response = self.client.post(BULK_RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("time_minutes", response.data[1])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_create_requires_list(self):
+        """Test bulk create rejects a single object."""
+        payload = {"title": "Recipe 1", "time_minutes": 10, "price": "1.50"}
+
+        response = self.client.post(BULK_RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limited(self):
+        """Test bulk create rejects more recipes than allowed."""
+        payload = [{"title": f"Recipe {i}", "time_minutes": 10, "price": "1.50"} for i in range(3)]
+
+        response = self.client.post(BULK_RECIPES_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("more than 2", response.data["non_field_errors"][0])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_create_query_count_constant(self):
+        """Test bulk create does not issue queries per recipe or tag."""
+
+        def payload(count):
+            return [
+                {
+                    "title": f"Recipe {i}",
+                    "time_minutes": 10,
+                    "price": "1.50",
+                    "tags": [{"name": f"Tag {i}"}, {"name": "Shared"}],
+                }
+                for i in range(count)
+            ]
+
+        single = count_queries(self.client.post, BULK_RECIPES_URL, payload(1), format="json")
+        many = count_queries(self.client.post, BULK_RECIPES_URL, payload(20), format="json")
+
+        self.assertEqual(single, many)
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_recipes(self):
+        """Test exporting streams every recipe of the user as NDJSON."""
+        tag = Tag.objects.create(user=self.user, name="Tag 1")
+        recipes = [create_recipe(user=self.user, title=f"Recipe {i}") for i in range(5)]
+        recipes[0].tags.add(tag)
+        create_recipe(user=create_user(email="other@example.com", password="test123"))
+
+        response = self.client.get(EXPORT_RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        expected = RecipeDetailSerializer(reversed(recipes), many=True).data
+        self.assertEqual([json.loads(line) for line in lines], json.loads(json.dumps(expected)))
+
+    def test_export_query_count_per_chunk(self):
+        """Test the export issues a fixed number of queries per chunk."""
+
+        def export():
+            return b"".join(self.client.get(EXPORT_RECIPES_URL).streaming_content)
+
+        for i in range(3):
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f"Tag {i}"))
+
+        with override_settings(RECIPE_EXPORT_CHUNK_SIZE=10):
+            single = count_queries(export)
+        with override_settings(RECIPE_EXPORT_CHUNK_SIZE=1):
+            many = count_queries(export)
+
+        # One tag prefetch per chunk: three chunks instead of one.
+        self.assertEqual(many - single, 2)
+
+
+class RecipeSparseFieldsTests(TestCase):
+    """Test trimming recipe responses with the fields parameter."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="testpass123")
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user, description="Long text")
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Tag 1"))
+
+    def test_list_selected_fields(self):
+        """Test only the requested fields are returned and loaded."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(RECIPES_URL, {"fields": "id,title"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"], [{"id": self.recipe.pk, "title": self.recipe.title}]
+        )
+        recipe_queries = [
+            query["sql"] for query in context.captured_queries if "core_recipe" in query["sql"]
+        ]
+        self.assertFalse(any('"core_recipe"."price"' in sql for sql in recipe_queries))
+        self.assertFalse(any("core_recipe_tags" in sql for sql in recipe_queries))
+
+    def test_list_with_tags_field(self):
+        """Test tags are still prefetched when requested."""
+        response = self.client.get(RECIPES_URL, {"fields": "title,tags"})
+
+        tag = self.recipe.tags.get()
+        self.assertEqual(
+            response.data["results"],
+            [{"title": self.recipe.title, "tags": [{"id": tag.pk, "name": tag.name}]}],
+        )
+
+    def test_detail_without_description(self):
+        """Test the detail view skips loading the description."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(detail_url(self.recipe.pk), {"fields": "id,price"})
+
+        self.assertEqual(response.data, {"id": self.recipe.pk, "price": "11.25"})
+        self.assertFalse(any("description" in query["sql"] for query in context.captured_queries))
+
+    def test_unknown_field_error(self):
+        response = self.client.get(RECIPES_URL, {"fields": "id,description"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeSearchTests(TestCase):
+    """Test full-text search of recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="testpass123")
+        self.client.force_authenticate(self.user)
+
+    def _search(self, terms, **params):
+        response = self.client.get(RECIPES_URL, {"search": terms, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response
+
+    def test_search_title_and_description(self):
+        """Test search matches stemmed words in titles and descriptions."""
+        soup = create_recipe(user=self.user, title="Tomato soup", description="Warm")
+        salad = create_recipe(user=self.user, title="Salad", description="With fresh tomatoes")
+        create_recipe(user=self.user, title="Cake", description="Sweet")
+        create_recipe(
+            user=create_user(email="other@example.com", password="test123"), title="Tomato"
+        )
+
+        response = self._search("tomato")
+
+        self.assertEqual([r["id"] for r in response.data["results"]], [soup.pk, salad.pk])
+
+    def test_search_vector_follows_updates(self):
+        """Test the search vector is kept up to date by the database."""
+        recipe = create_recipe(user=self.user, title="Pancakes")
+        self.client.patch(detail_url(recipe.pk), {"title": "Waffles"})
+
+        self.assertEqual(self._search("pancakes").data["results"], [])
+        self.assertEqual(len(self._search("waffles").data["results"]), 1)
+
+    def test_search_paginated_by_rank(self):
+        """Test ranked results can be paged through without gaps or repeats."""
+        for i in range(5):
+            create_recipe(user=self.user, title="Bread " * (i + 1), description=f"Loaf {i}")
+
+        ids = []
+        response = self._search("bread", page_size=2)
+        while True:
+            ids += [recipe["id"] for recipe in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_search_uses_gin_index(self):
+        """Test the search filter is answered from the GIN index."""
+        query = SearchQuery("bread", config="english", search_type="websearch")
+        queryset = Recipe.objects.filter(search_vector=query)
+
+        self.assertIn(
+            "recipe_search_vector_idx", used_indexes(queryset, settings=("enable_seqscan",))
+        )
+
+
+class RecipeConditionalGetTests(TestCase):
+    """Test conditional requests for the recipe list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="testpass123")
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_list_sets_validators(self):
+        """Test the list response carries an ETag and Last-Modified."""
+        response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_not_modified(self):
+        """Test a current ETag is answered with 304 without loading recipes."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_weak_etag_match_not_modified(self):
+        """Test ETags weakened by compression still match."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=f"W/{etag}")
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_on_update(self):
+        """Test changing a recipe invalidates the ETag."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.client.patch(detail_url(self.recipe.pk), {"title": "New title"})
+
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_on_delete(self):
+        """Test deleting a recipe invalidates the ETag."""
+        create_recipe(user=self.user)
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.recipe.delete()
+
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_on_nested_tag_rename(self):
+        """Test renaming a tag shown in the list invalidates the ETag."""
+        tag = Tag.objects.create(user=self.user, name="Tag 1")
+        self.recipe.tags.add(tag)
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        tag.name = "Tag 2"
+        tag.save()
+
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_page(self):
+        """Test different pages of the list have different ETags."""
+        first = self.client.get(RECIPES_URL)["ETag"]
+        other = self.client.get(RECIPES_URL, {"page_size": 1})["ETag"]
+
+        self.assertNotEqual(first, other)
+
+    def test_etag_depends_on_accepted_media_type(self):
+        """Test renderings for different Accept parameters have different ETags."""
+        compact = self.client.get(RECIPES_URL, HTTP_ACCEPT="application/json")
+        indented = self.client.get(RECIPES_URL, HTTP_ACCEPT="application/json; indent=4")
+
+        self.assertNotEqual(compact["ETag"], indented["ETag"])
+        self.assertIn("Accept", indented["Vary"])
+
+
+class RecipeQueryCountTests(TestCase):
+    """Test the number of queries does not grow with the amount of data."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="test@example.com", password="testpass123")
+        self.client.force_authenticate(self.user)
+
+    def _create_tagged_recipes(self, count, tags_per_recipe=3):
+        """Create recipes with their own tags."""
+        recipes = []
+        for i in range(count):
+            recipe = create_recipe(user=self.user, title=f"Recipe {i}")
+            for j in range(tags_per_recipe):
+                recipe.tags.add(Tag.objects.create(user=self.user, name=f"Tag {recipe.pk}-{j}"))
+            recipes.append(recipe)
+
+        return recipes
+
+    def test_list_query_count_constant(self):
+        """Test listing recipes does not issue a query per recipe."""
+        self._create_tagged_recipes(1)
+        single = count_queries(self.client.get, RECIPES_URL)
+
+        self._create_tagged_recipes(10)
+        many = count_queries(self.client.get, RECIPES_URL)
+
+        self.assertEqual(single, many)
+
+    def test_retrieve_query_count_constant(self):
+        """Test retrieving a recipe does not issue a query per tag."""
+        few, lots = self._create_tagged_recipes(1, 1) + self._create_tagged_recipes(1, 10)
+
+        single = count_queries(self.client.get, detail_url(few.pk))
+        many = count_queries(self.client.get, detail_url(lots.pk))
+
+        self.assertEqual(single, many)
+
+    def test_create_query_count_constant(self):
+        """Test creating a recipe does not depend on the size of the collection."""
+        payload = {"title": "New recipe", "time_minutes": 10, "price": Decimal("1.00")}
+
+        self._create_tagged_recipes(1)
+        single = count_queries(self.client.post, RECIPES_URL, payload, format="json")
+
+        self._create_tagged_recipes(10)
+        many = count_queries(self.client.post, RECIPES_URL, payload, format="json")
+
+        self.assertEqual(single, many)
+
+    def test_create_with_tags_query_count_constant(self):
+        """Test creating a recipe does not issue queries per tag."""
+        Tag.objects.create(user=self.user, name="Tag 0")
+
+        def payload(tag_count):
+            return {
+                "title": "New recipe",
+                "time_minutes": 10,
+                "price": Decimal("1.00"),
+                "tags": [{"name": f"Tag {i}"} for i in range(tag_count)],
+            }
+
+        single = count_queries(self.client.post, RECIPES_URL, payload(2), format="json")
+        many = count_queries(self.client.post, RECIPES_URL, payload(20), format="json")
+
+        self.assertEqual(single, many)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 20)
+
+    def test_update_query_count_constant(self):
+        """Test updating a recipe does not issue a query per tag."""
+        few, lots = self._create_tagged_recipes(1, 1) + self._create_tagged_recipes(1, 10)
+        payload = {"title": "New title"}
+
+        single = count_queries(self.client.patch, detail_url(few.pk), payload, format="json")
+        many = count_queries(self.client.patch, detail_url(lots.pk), payload, format="json")
+
+        self.assertEqual(single, many)
@@ -0,0 +1,218 @@
+"""
+    Tests for similar-recipe lookups.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe import similarity
+from recipe.cloning import clone_recipes
+from rest_framework import status
+from rest_framework.test import APIClient
+
+SIMILARITY = {"LIMIT": 10, "MAX_LIMIT": 100, "CHECK_INTERVAL": 60, "MAX_USERS": 100}
+
+
+def similar_url(recipe_id):
+    return reverse("recipe:recipe-similar", args=[recipe_id])
+
+
+@override_settings(RECIPE_SIMILARITY=SIMILARITY)
+class SimilarRecipeApiTests(TestCase):
+    """Tests for the similar action."""
+
+    def setUp(self):
+        self.addCleanup(similarity._indexes.clear)
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        vegan = Tag.objects.create(user=self.user, name="Vegan")
+        quick = Tag.objects.create(user=self.user, name="Quick")
+        self.dinner = Tag.objects.create(user=self.user, name="Dinner")
+        rice = Ingredient.objects.create(user=self.user, name="Rice")
+        self.recipe = self.create_recipe("Curry", tags=[vegan, quick], ingredients=[rice])
+        self.twin = self.create_recipe("Stir fry", tags=[vegan, quick], ingredients=[rice])
+        self.related = self.create_recipe("Salad", tags=[vegan])
+        self.unrelated = self.create_recipe("Roast", tags=[self.dinner])
+        self.create_recipe("Toast")
+
+    def create_recipe(self, title, tags=(), ingredients=()):
+        recipe = Recipe.objects.create(
+            user=self.user, title=title, time_minutes=10, price=Decimal("1.00")
+        )
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+
+        return recipe
+
+    def similar(self, recipe_id, **params):
+        response = self.client.get(similar_url(recipe_id), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [(item["id"], round(item["similarity"], 3)) for item in response.data["results"]]
+
+    def test_similar_ranked_by_jaccard(self):
+        """Test recipes sharing features are ranked by Jaccard similarity."""
+        self.assertEqual(
+            self.similar(self.recipe.id), [(self.twin.id, 1.0), (self.related.id, 0.333)]
+        )
+
+    def test_similar_results_are_recipes(self):
+        response = self.client.get(similar_url(self.recipe.id))
+
+        self.assertEqual(response.data["results"][0]["title"], "Stir fry")
+        self.assertEqual(len(response.data["results"][0]["tags"]), 2)
+
+    def test_limit(self):
+        self.assertEqual(self.similar(self.recipe.id, limit=1), [(self.twin.id, 1.0)])
+
+        response = self.client.get(similar_url(self.recipe.id), {"limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_recipe_not_found(self):
+        other = get_user_model().objects.create_user("other@example.com", "testpass123")
+        recipe = Recipe.objects.create(
+            user=other, title="Other", time_minutes=10, price=Decimal("1.00")
+        )
+
+        response = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_link_changes_update_index_incrementally(self):
+        """Test tag changes made through the ORM update the loaded index in place."""
+        self.similar(self.recipe.id)
+
+        with patch.object(similarity.SimilarityIndex, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.unrelated.tags.set([self.recipe.tags.first()])
+
+            results = self.similar(self.recipe.id)
+
+        build.assert_not_called()
+        self.assertEqual(
+            results,
+            [(self.twin.id, 1.0), (self.unrelated.id, 0.333), (self.related.id, 0.333)],
+        )
+
+    @override_settings(RECIPE_SIMILARITY={**SIMILARITY, "CHECK_INTERVAL": 0})
+    def test_api_updates_keep_index(self):
+        """Test recipes changed through the API are applied without rebuilding the index."""
+        self.similar(self.recipe.id)
+        payload = {"title": "Dinner salad", "tags": [{"name": "Vegan"}, {"name": "Dinner"}]}
+
+        with patch.object(similarity.SimilarityIndex, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    reverse("recipe:recipe-detail", args=[self.related.id]),
+                    payload,
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            results = self.similar(self.unrelated.id)
+
+        build.assert_not_called()
+        self.assertEqual(results, [(self.related.id, 0.5)])
+
+    def test_orm_writes_keep_index_state(self):
+        """Test writes through the ORM advance the index state as the database does."""
+        self.similar(self.recipe.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe("Soup", tags=[self.dinner])
+            recipe.title = "Hot soup"
+            recipe.save()
+            Tag.objects.create(user=self.user, name="Winter")
+            Ingredient.objects.create(user=self.user, name="Leek")
+            self.twin.delete()
+
+        index = similarity._indexes[self.user.id]
+        self.assertEqual(index.state, similarity.user_state(self.user.id))
+        self.assertIn(recipe.id, index)
+        self.assertNotIn(self.twin.id, index)
+
+    def test_delete_updates_index(self):
+        self.similar(self.recipe.id)
+
+        with patch.object(similarity.SimilarityIndex, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.twin.delete()
+                self.dinner.delete()
+
+            self.assertEqual(self.similar(self.recipe.id), [(self.related.id, 0.333)])
+
+        build.assert_not_called()
+        index = similarity._indexes[self.user.id]
+        self.assertEqual(index.features[index.rows[self.unrelated.id]], set())
+
+    @override_settings(RECIPE_SIMILARITY={**SIMILARITY, "CHECK_INTERVAL": 0})
+    def test_changes_without_signals_rebuild_index(self):
+        """Test recipes written with set-based SQL are picked up by the state check."""
+        self.similar(self.recipe.id)
+
+        [copy] = Recipe.objects.bulk_create(
+            [Recipe(user=self.user, title="Copy", time_minutes=10, price=Decimal("1.00"))]
+        )
+        Recipe.tags.through.objects.bulk_create(
+            [Recipe.tags.through(recipe=copy, tag=tag) for tag in self.recipe.tags.all()]
+        )
+        Recipe.ingredients.through.objects.bulk_create(
+            [
+                Recipe.ingredients.through(recipe=copy, ingredient=ingredient)
+                for ingredient in self.recipe.ingredients.all()
+            ]
+        )
+
+        self.assertEqual(self.similar(self.recipe.id)[0], (copy.id, 1.0))
+
+    def test_clone_drops_index(self):
+        self.similar(self.recipe.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clone_recipes(self.user, [self.recipe.id])
+
+        self.assertNotIn(self.user.id, similarity._indexes)
+
+    def test_recipe_created_elsewhere(self):
+        """Test recipes missing from a loaded index trigger a rebuild."""
+        self.similar(self.recipe.id)
+        [(_, clone_id)] = clone_recipes(self.user, [self.recipe.id])
+
+        self.assertEqual(self.similar(clone_id)[:2], [(self.twin.id, 1.0), (self.recipe.id, 1.0)])
+
+
+class SimilarityIndexTests(TestCase):
+    """Tests for the index itself."""
+
+    def setUp(self):
+        self.index = similarity.SimilarityIndex(
+            {1: {10, 11}, 2: {10, 11, 12}, 3: {10}, 4: {13}, 5: set()}, state="state"
+        )
+
+    def test_similar(self):
+        self.assertEqual(self.index.similar(1, 10), [(2, 2 / 3), (3, 0.5)])
+        self.assertEqual(self.index.similar(5, 10), [])
+
+    def test_top_results_break_ties_by_newest(self):
+        index = similarity.SimilarityIndex({i: {1} for i in range(1, 8)}, state="state")
+
+        self.assertEqual([match for match, _ in index.similar(1, 3)], [7, 6, 5])
+
+    def test_remove_feature(self):
+        self.index.remove_feature(10)
+
+        self.assertEqual(self.index.similar(1, 10), [(2, 0.5)])
+        self.assertEqual(list(self.index.sizes), [1, 2, 0, 1, 0])
+
+    def test_set_features_and_remove(self):
+        self.index.set_features(4, {10, 11})
+        self.index.set_features(6, {11})
+        self.index.remove(2)
+
+        self.assertEqual(self.index.similar(1, 10), [(4, 1.0), (6, 0.5), (3, 0.5)])
+        self.assertNotIn(2, self.index)
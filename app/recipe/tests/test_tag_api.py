@@ -57,7 +57,7 @@ class PrivateTagApiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test list of tags limited to the user."""
@@ -68,9 +68,38 @@ class PrivateTagApiTests(TestCase):
         response = self.client.get(TAGS_URL)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], tag.name)
-        self.assertEqual(response.data[0]["id"], tag.pk)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], tag.name)
+        self.assertEqual(response.data["results"][0]["id"], tag.pk)
+
+    def test_tag_list_paginated(self):
+        """Test tags are paginated by name in descending order."""
+        for name in ("Apple", "Banana", "Cherry"):
+            Tag.objects.create(user=self.user, name=name)
+
+        response = self.client.get(TAGS_URL, {"page_size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag["name"] for tag in response.data["results"]], ["Cherry", "Banana"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual([tag["name"] for tag in response.data["results"]], ["Apple"])
+        self.assertIsNone(response.data["next"])
+
+    def test_tag_list_not_modified(self):
+        """Test the tag list answers a current ETag with 304."""
+        Tag.objects.create(user=self.user, name="Vegan")
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        response = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Tag.objects.create(user=self.user, name="Dessert")
+        response = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_update_tag(self):
         """Test updating a tag."""
@@ -85,6 +114,17 @@ class PrivateTagApiTests(TestCase):
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload["name"])
 
+    def test_update_tag_duplicate_name_error(self):
+        """Test renaming a tag to an existing name returns an error."""
+        Tag.objects.create(user=self.user, name="Fruit")
+        tag = Tag.objects.create(user=self.user, name="Vegetables")
+
+        response = self.client.patch(detail_url(tag.pk), {"name": "Fruit"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Vegetables")
+
     def test_delete_tag(self):
         """Test deleting a tag."""
         tag = Tag.objects.create(user=self.user, name="Tag 1")
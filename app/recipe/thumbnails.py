@@ -0,0 +1,26 @@
+"""
+    Thumbnail rendering, run in worker processes.
+
+    This module only depends on Pillow so that workers can import it without
+    setting up Django.
+"""
+import os
+
+from PIL import Image
+
+
+def make_thumbnail(source, target, size, quality=85):
+    """Write a JPEG thumbnail of the image at source, at most size pixels on each side."""
+    with Image.open(source) as image:
+        # Let the JPEG decoder downscale while decoding, which is much cheaper.
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        thumbnail = image.convert("RGB")
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Written next to the target and renamed so readers never see a partial file.
+    partial = f"{target}.{os.getpid()}.part"
+    thumbnail.save(partial, "JPEG", quality=quality, optimize=True)
+    os.replace(partial, target)
+
+    return target
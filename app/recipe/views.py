@@ -1,37 +1,287 @@
 """
     Views for the recipe APIs.
 """
+import logging
+import time
+from itertools import islice
+
+from core import deletion
 from core.models import Ingredient, Recipe, Tag
-from recipe import serializers
-from rest_framework import mixins, viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Prefetch, prefetch_related_objects
+from django.db.models.functions import Cast
+from django.http import Http404, StreamingHttpResponse
+from drf_spectacular.utils import extend_schema
+from recipe import cloning, images, importer, serializers, similarity
+from recipe.bulk import BulkChangeMixin
+from recipe.cache import CachedListMixin
+from recipe.conditional import ConditionalListMixin, collection_state
+from recipe.fastpath import FastListMixin
+from recipe.filters import filter_recipes
+from recipe.pagination import NameCursorPagination, RecipeCursorPagination
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from user.authentication import CachedTokenAuthentication
+
+logger = logging.getLogger(__name__)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalListMixin, FastListMixin, BulkChangeMixin, viewsets.ModelViewSet):
     """View for manage recipe APIs."""
 
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    bulk_delete_function = staticmethod(deletion.delete_recipes)
+    rename_serializer_class = serializers.RecipeRenameSerializer
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    pagination_ordering = None
 
     def get_queryset(self):
         """Return queryset of recipes based on the authenticated user."""
-        return Recipe.objects.all().filter(user=self.request.user).order_by("-id")
+        queryset = Recipe.objects.all().filter(user=self.request.user).order_by("-id")
+
+        # Tags are ordered so that the fast list path returns them in the same order.
+        tags = Prefetch("tags", queryset=Tag.objects.order_by("id"))
+        fields = self.get_requested_fields()
+        if fields is None:
+            queryset = queryset.defer("search_vector").prefetch_related(tags)
+        else:
+            queryset = queryset.only(*(name for name in fields if name != "tags"))
+            if "tags" in fields:
+                queryset = queryset.prefetch_related(tags)
+
+        if self.action == "list":
+            queryset = filter_recipes(queryset, self.request.query_params)
+            search = self.request.query_params.get("search")
+            if search:
+                queryset = self._search(queryset, search)
+
+        return queryset
+
+    def _search(self, queryset, search):
+        """Filter recipes matching the search terms, best matches first."""
+        query = SearchQuery(search, config=settings.RECIPE_SEARCH_CONFIG, search_type="websearch")
+        # Ranks are cast to double precision so cursor positions compare exactly.
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        self.pagination_ordering = ("-rank", "-id")
+
+        return queryset.filter(search_vector=query).annotate(rank=rank).order_by("-rank", "-id")
+
+    def get_collection_state(self):
+        """Return the state of the user's recipes and the tags nested in them."""
+        user = self.request.user
+        return collection_state(Recipe.objects.filter(user=user), Tag.objects.filter(user=user))
 
     def get_serializer_class(self):
         """Return recipe serializer based on the performed action."""
-        if self.action in ["list", "create"]:
+        if self.action in ["list", "create", "bulk_create", "similar"]:
             return serializers.RecipeSerializer
+        if self.action == "image":
+            return serializers.RecipeImageSerializer
 
         return serializers.RecipeDetailSerializer
 
+    def get_requested_fields(self):
+        """Return the fields listed in the "fields" query parameter of reads, or None."""
+        if self.action not in ("list", "retrieve"):
+            return None
+        param = self.request.query_params.get("fields")
+        if not param:
+            return None
+
+        fields = list(dict.fromkeys(name.strip() for name in param.split(",") if name.strip()))
+        unknown = set(fields) - set(self.get_serializer_class().Meta.fields)
+        if unknown:
+            raise ValidationError({"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+
+        return context
+
     def perform_create(self, serializer):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """Create many recipes in a single transaction."""
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of recipes."]})
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(user=request.user)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """List the user's recipes sharing the most tags and ingredients with this one."""
+        options = settings.RECIPE_SIMILARITY
+        try:
+            recipe_id = int(pk)
+        except ValueError:
+            raise Http404
+        try:
+            limit = int(request.query_params.get("limit", options["LIMIT"]))
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        if not 1 <= limit <= options["MAX_LIMIT"]:
+            raise ValidationError({"limit": [f"Must be between 1 and {options['MAX_LIMIT']}."]})
+
+        index = similarity.get_index(request.user.pk)
+        if recipe_id not in index:
+            # The recipe may have been created by another process since the last check.
+            if not Recipe.objects.filter(user=request.user, pk=recipe_id).exists():
+                raise Http404
+            index = similarity.get_index(request.user.pk, rebuild=True)
+
+        matches = index.similar(recipe_id, limit)
+        recipes = self.get_queryset().in_bulk([match_id for match_id, _ in matches])
+        serializer = self.get_serializer()
+        results = []
+        for match_id, score in matches:
+            if match_id in recipes:
+                data = serializer.to_representation(recipes[match_id])
+                data["similarity"] = score
+                results.append(data)
+
+        return Response({"results": results})
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """Create a copy of the recipe with the same tags and ingredients."""
+        recipe = self.get_object()
+        with transaction.atomic():
+            [(_, clone_id)] = cloning.clone_recipes(request.user, [recipe.pk])
+        serializer = self.get_serializer(self.get_queryset().get(pk=clone_id))
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        operation_id="recipe_recipes_bulk_clone",
+        request=serializers.BulkIdsSerializer,
+        responses={201: serializers.BulkCloneResultSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="clone")
+    def bulk_clone(self, request):
+        """Copy many recipes at once, ids of other users' recipes are ignored."""
+        serializer = serializers.BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            pairs = cloning.clone_recipes(request.user, serializer.validated_data["ids"])
+
+        clones = [{"source": source_id, "id": clone_id} for source_id, clone_id in pairs]
+        return Response({"created": len(clones), "clones": clones}, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_recipes(self, request):
+        """Import recipes from an uploaded NDJSON or CSV file."""
+        upload = request.data.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+
+        file_format = request.data.get("file_format")
+        if file_format is None:
+            file_format = "csv" if upload.name.lower().endswith(".csv") else "ndjson"
+        if file_format not in importer.FORMATS:
+            raise ValidationError({"file_format": [f"Expected one of {importer.FORMATS}."]})
+
+        lines = (line.decode("utf-8") for line in upload)
+        try:
+            result = importer.import_recipes(request.user, importer.READERS[file_format](lines))
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["The file must be UTF-8 encoded."]})
+        except importer.ImportFailed as error:
+            raise ValidationError({"file": [str(error)]})
+
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["get", "post"], parser_classes=[MultiPartParser])
+    def image(self, request, pk=None):
+        """Upload an image to the recipe, or get the status of its thumbnail."""
+        if request.method == "GET":
+            return Response(self.get_serializer(self.get_object()).data)
+
+        # Stream the upload to a temporary file instead of holding it in memory.
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        upload_handler = images.LimitedUploadHandler(request._request, max_size)
+        request._request.upload_handlers = [upload_handler]
+        recipe = self.get_object()
+        data = request.data
+        if upload_handler.too_large:
+            raise ValidationError({"image": [f"Images cannot be larger than {max_size} bytes."]})
+        serializer = self.get_serializer(recipe, data=data)
+        serializer.is_valid(raise_exception=True)
+        images.attach_image(recipe, serializer.validated_data["image"])
+
+        pending = recipe.image_status == "pending"
+        return Response(
+            serializer.data, status=status.HTTP_202_ACCEPTED if pending else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every recipe of the user as newline-delimited JSON."""
+        response = StreamingHttpResponse(self._export_lines(), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="recipes.ndjson"'
+
+        return response
+
+    def _export_lines(self):
+        """Yield one JSON line per recipe, reading the recipes in fixed-size chunks."""
+        chunk_size = settings.RECIPE_EXPORT_CHUNK_SIZE
+        # iterator() uses a server-side cursor and ignores prefetch_related, so tags are
+        # prefetched for each chunk instead.
+        recipes = (
+            Recipe.objects.filter(user=self.request.user).order_by("-id").iterator(chunk_size)
+        )
+        serializer = serializers.RecipeDetailSerializer(context=self.get_serializer_context())
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        started = time.monotonic()
+        rows = 0
+
+        while True:
+            chunk = list(islice(recipes, chunk_size))
+            if not chunk:
+                break
+            prefetch_related_objects(chunk, "tags")
+            yield "".join(encoder.encode(serializer.to_representation(r)) + "\n" for r in chunk)
+            rows += len(chunk)
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Exported %d recipes for user %s in %.2fs (%.0f rows/s)",
+            rows,
+            self.request.user.pk,
+            elapsed,
+            rows / elapsed if elapsed else 0,
+        )
+
 
 class TagViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
+    FastListMixin,
+    BulkChangeMixin,
     mixins.ListModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
@@ -40,22 +290,45 @@ class TagViewSet(
     """Manage Tag objects."""
 
     serializer_class = serializers.TagSerializer
+    rename_serializer_class = serializers.TagRenameSerializer
+    invalidates_cached_lists = True
+    bulk_delete_function = staticmethod(deletion.delete_tags)
     queryset = Tag.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = NameCursorPagination
 
     def get_queryset(self):
         """Return the user's tags."""
         return self.queryset.filter(user=self.request.user).order_by("-name")
 
+    def perform_update(self, serializer):
+        """Update a tag, rejecting names the user already has."""
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError({"name": ["Tag with this name already exists."]})
+
 
-class IngredientViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class IngredientViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
+    FastListMixin,
+    BulkChangeMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     """Manage ingredients in the database."""
 
     serializer_class = serializers.IngredientSerializer
+    rename_serializer_class = serializers.IngredientRenameSerializer
+    invalidates_cached_lists = True
+    bulk_delete_function = staticmethod(deletion.delete_ingredients)
     queryset = Ingredient.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = NameCursorPagination
 
     def get_queryset(self):
         """Filter queryset by the user."""
@@ -0,0 +1,110 @@
+"""
+    Authentication classes for the APIs.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """Bounded LRU mapping token keys to (user, token) pairs.
+
+    Entries expire after local_ttl seconds, deletions in other processes are not seen
+    before. When cache_alias is given, entries are also stored in that Django cache for
+    ttl seconds, so that every process shares them and sees deletions once its own
+    entry expired.
+    """
+
+    key_prefix = "authtoken:"
+
+    def __init__(self, max_size, ttl, cache_alias=None, local_ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.local_ttl = ttl if local_ttl is None else min(ttl, local_ttl)
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        """Return the shared Django cache, if one is configured."""
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, key):
+        """Return the cached pair for the token key or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if self.shared is not None:
+            value = self.shared.get(self.key_prefix + key)
+            if value is not None:
+                self._store(key, value)
+                return value
+
+        return None
+
+    def set(self, key, value):
+        """Cache the pair for the token key."""
+        self._store(key, value)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, value, self.ttl)
+
+    def delete(self, key):
+        """Drop the token key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + key)
+
+    def clear(self):
+        """Drop every local entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.local_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_AUTH_CACHE["MAX_SIZE"],
+    ttl=settings.TOKEN_AUTH_CACHE["TTL"],
+    cache_alias=settings.TOKEN_AUTH_CACHE["CACHE_ALIAS"],
+    local_ttl=settings.TOKEN_AUTH_CACHE["LOCAL_TTL"],
+)
+
+
+def forget_user_tokens(user_id):
+    """Drop the cached tokens of a user, call after changing users without signals."""
+    for key in Token.objects.filter(user_id=user_id).values_list("key", flat=True):
+        token_cache.delete(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that skips the token and user lookup for recently seen keys."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+
+        user, token = cached
+        # Views may modify request.user, so never hand out the cached instance itself.
+        return copy.copy(user), token
@@ -0,0 +1,44 @@
+"""
+    Signal handlers keeping the token cache in sync with the database.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from user.authentication import forget_user_tokens, token_cache
+
+# Logins only change last_login, which the cached users need not reflect.
+IGNORED_USER_FIELDS = ("last_login",)
+
+
+def _cached_fields(user):
+    """Return the loaded values of the user fields cached with their tokens."""
+    return {
+        field.attname: user.__dict__.get(field.attname)
+        for field in user._meta.concrete_fields
+        if field.name not in IGNORED_USER_FIELDS
+    }
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted."""
+    token_cache.delete(instance.key)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_fields(sender, instance, **kwargs):
+    instance._token_cache_fields = _cached_fields(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user_tokens(sender, instance, created, **kwargs):
+    """Reload the user on the next request after a change, e.g. a deactivation.
+
+    Saves that change nothing but last_login skip looking up the user's tokens.
+    """
+    fields = _cached_fields(instance)
+    changed = fields != instance._token_cache_fields
+    instance._token_cache_fields = fields
+    if changed and not created:
+        forget_user_tokens(instance.pk)
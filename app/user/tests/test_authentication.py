@@ -0,0 +1,123 @@
+"""
+    Tests for the cached token authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from user.authentication import TokenCache, forget_user_tokens, token_cache
+
+ME_URL = reverse("user:me")
+
+
+class TokenCacheTests(TestCase):
+    """Test the bounded token cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        cache = TokenCache(max_size=2, ttl=0)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+
+    def test_deletion_seen_by_other_processes(self):
+        """Test a token deleted in one process is refused by others once their entry expired."""
+        cache = TokenCache(max_size=2, ttl=60, cache_alias="default", local_ttl=0)
+        other_process = TokenCache(max_size=2, ttl=60, cache_alias="default", local_ttl=0)
+        cache.set("a", 1)
+        self.assertEqual(other_process.get("a"), 1)
+
+        cache.delete("a")
+
+        self.assertIsNone(other_process.get("a"))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating requests with cached tokens."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123", name="Test Name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def test_repeated_requests_skip_token_lookup(self):
+        """Test the token is only looked up on the first request."""
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(len(second.captured_queries), len(first.captured_queries) - 1)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops working immediately."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user revokes cached tokens immediately."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_reloaded(self):
+        """Test changes to the user are visible on the next request."""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"name": "New Name"})
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.data["name"], "New Name")
+
+    def test_login_keeps_cached_tokens(self):
+        """Test saves only changing last_login do not look up the user's tokens."""
+        self.user.last_login = timezone.now()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(update_fields=["last_login"])
+
+        self.assertEqual(len(queries), 1)
+
+    def test_forget_user_tokens(self):
+        """Test users deactivated without signals are reloaded once forgotten."""
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+
+        forget_user_tokens(self.user.pk)
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)